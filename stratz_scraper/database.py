@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from collections.abc import Mapping, Sequence as SequenceCollection
 from contextlib import contextmanager
+import logging
 import os
 import threading
 import time
@@ -9,12 +10,15 @@ from typing import Callable, Iterable, Sequence
 
 from dotenv import load_dotenv
 from psycopg import Connection, Cursor, Error, connect, errors
+from psycopg.pq import TransactionStatus
 from psycopg.rows import dict_row
 
 from flask import has_app_context
 
 load_dotenv()
 
+_LOGGER = logging.getLogger(__name__)
+
 INITIAL_PLAYER_ID = 293053907
 
 def _build_database_url() -> str:
@@ -31,9 +35,39 @@ def _build_database_url() -> str:
 
 DATABASE_URL = _build_database_url()
 
+
+def _build_session_options() -> str:
+    # Session settings are sent in the startup packet so every connection is
+    # tuned without paying an extra round-trip for ``SET`` statements.
+    synchronous_commit = os.environ.get("POSTGRES_SYNCHRONOUS_COMMIT", "off")
+    options = f"-c synchronous_commit={synchronous_commit}"
+    # No lock timeout by default: statements outside the retry helpers would
+    # fail outright instead of waiting for their locks.
+    lock_timeout = os.environ.get("POSTGRES_LOCK_TIMEOUT")
+    if lock_timeout:
+        options += f" -c lock_timeout={lock_timeout}"
+    return options
+
+
+SESSION_OPTIONS = _build_session_options()
+
 _THREAD_LOCAL = threading.local()
+# Idle read-only connections are shared across threads so the per-connection
+# prepared statements that psycopg creates for hot queries survive between
+# requests instead of being discarded with a fresh connection every time.
+READ_POOL_SIZE = 8
+_READ_POOL: list[Connection] = []
+_READ_POOL_LOCK = threading.Lock()
+WRITE_POOL_SIZE = 8
+_WRITE_POOL: list[Connection] = []
+_WRITE_POOL_LOCK = threading.Lock()
 _SCHEMA_INITIALIZED = False
 _SCHEMA_ADVISORY_LOCK_ID = int.from_bytes(b"stratzSC", "big")
+PLAYER_COUNTER_SLOTS = 16
+PLAYERS_ANALYZE_SCALE_FACTOR = "0.02"
+# Transaction-local setting that ``hero_top100_maintain`` turns on whenever it
+# changes the leaderboard, so writers can tell whether caches went stale.
+HERO_TOP100_CHANGED_SETTING = "stratz_scraper.hero_top100_changed"
 
 _RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
     errors.DeadlockDetected,
@@ -43,7 +77,11 @@ _RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
 
 
 def _create_connection(*, autocommit: bool) -> Connection:
-    connection = connect(DATABASE_URL, autocommit=autocommit)
+    connection = connect(
+        DATABASE_URL,
+        autocommit=autocommit,
+        options=SESSION_OPTIONS,
+    )
     connection.row_factory = dict_row
     return connection
 
@@ -62,12 +100,21 @@ def row_value(row: Mapping[str, object] | object, key: str) -> object:
     raise KeyError(key)
 
 
+def _disable_lock_timeout(connection: Connection) -> None:
+    # Schema setup and maintenance statements are not retried, so they wait for
+    # their locks (including ACCESS EXCLUSIVE ones for trigger DDL) instead of
+    # failing after a configured ``lock_timeout``. ``SET LOCAL`` ends with
+    # the transaction.
+    connection.execute("SET LOCAL lock_timeout = 0")
+
+
 def ensure_schema_exists() -> None:
     global _SCHEMA_INITIALIZED
     if _SCHEMA_INITIALIZED:
         return
     refresh_needed = False
     with _create_connection(autocommit=False) as conn:
+        _disable_lock_timeout(conn)
         with conn.cursor() as cur:
             cur.execute(
                 "SELECT pg_advisory_xact_lock(%s)",
@@ -76,6 +123,7 @@ def ensure_schema_exists() -> None:
         try:
             ensure_schema(existing=conn)
             ensure_indexes(existing=conn)
+            ensure_triggers(existing=conn)
             with conn.cursor() as cur:
                 cur.execute("SELECT 1 FROM public.hero_top100 LIMIT 1")
                 refresh_needed = cur.fetchone() is None
@@ -98,6 +146,58 @@ def connect_pg(*, autocommit: bool = True) -> Connection:
     return _create_connection(autocommit=autocommit)
 
 
+def _acquire_read_connection() -> Connection:
+    with _READ_POOL_LOCK:
+        while _READ_POOL:
+            connection = _READ_POOL.pop()
+            if not connection.closed:
+                return connection
+    return connect_pg(autocommit=True)
+
+
+def _release_read_connection(connection: Connection) -> None:
+    """Return an autocommit connection to the idle pool or close it."""
+
+    if (
+        not connection.closed
+        and connection.info.transaction_status == TransactionStatus.IDLE
+    ):
+        with _READ_POOL_LOCK:
+            if len(_READ_POOL) < READ_POOL_SIZE:
+                _READ_POOL.append(connection)
+                return
+    try:
+        connection.close()
+    except Error:
+        pass
+
+
+def _acquire_write_connection() -> Connection:
+    with _WRITE_POOL_LOCK:
+        while _WRITE_POOL:
+            connection = _WRITE_POOL.pop()
+            if not connection.closed:
+                return connection
+    return connect_pg(autocommit=False)
+
+
+def _release_write_connection(connection: Connection) -> None:
+    """Return a committed or rolled back connection to the idle pool or close it."""
+
+    if (
+        not connection.closed
+        and connection.info.transaction_status == TransactionStatus.IDLE
+    ):
+        with _WRITE_POOL_LOCK:
+            if len(_WRITE_POOL) < WRITE_POOL_SIZE:
+                _WRITE_POOL.append(connection)
+                return
+    try:
+        connection.close()
+    except Error:
+        pass
+
+
 @contextmanager
 def db_connection(*, write: bool = False) -> Iterable[Connection]:
     ensure_schema_exists()
@@ -131,9 +231,12 @@ def db_connection(*, write: bool = False) -> Iterable[Connection]:
                 cache["write"] = connection
             cached_connection = True
         else:
-            connection = connect_pg(autocommit=False)
+            # Background workers run outside an app context; borrow an idle
+            # connection instead of opening a new socket per call.
+            connection = _acquire_write_connection()
     else:
-        connection = connect_pg(autocommit=True)
+        connection = _acquire_read_connection()
+    failed = False
     try:
         yield connection
         if write and connection is not None:
@@ -143,6 +246,7 @@ def db_connection(*, write: bool = False) -> Iterable[Connection]:
                 connection.rollback()
                 raise
     except Exception:
+        failed = True
         if write and connection is not None:
             try:
                 connection.rollback()
@@ -150,7 +254,11 @@ def db_connection(*, write: bool = False) -> Iterable[Connection]:
                 pass
         raise
     finally:
-        if connection is not None and (not write or not cached_connection):
+        if connection is not None and not write and not failed:
+            _release_read_connection(connection)
+        elif connection is not None and write and not cached_connection:
+            _release_write_connection(connection)
+        elif connection is not None and not write:
             try:
                 connection.close()
             except Error:
@@ -178,18 +286,42 @@ def retryable_execute(
     parameters: Sequence | None = None,
     *,
     retry_interval: float = 0.5,
+    prepare: bool | None = None,
 ):
+    """Execute ``sql``, retrying on deadlocks, serialization failures and lock
+    timeouts.
+
+    ``prepare`` is forwarded to psycopg; pass ``True`` for hot statements so the
+    server plans them once per connection instead of after the default
+    ``prepare_threshold`` executions."""
     if parameters is None:
         parameters = ()
+    connection = target if isinstance(target, Connection) else target.connection
+    # Inside an open transaction a failed statement aborts everything after
+    # it, so each attempt runs in a savepoint that can be rolled back on its
+    # own.  Outside one (autocommit, or the first statement of a transaction)
+    # the statement can simply be replayed once the connection is idle again.
+    if (
+        not connection.autocommit
+        and connection.info.transaction_status == TransactionStatus.INTRANS
+    ):
+        while True:
+            try:
+                with connection.transaction():
+                    return target.execute(sql, parameters, prepare=prepare)
+            except _RETRYABLE_ERRORS:
+                _LOGGER.warning(
+                    "Retrying statement after a transient error", exc_info=True
+                )
+            time.sleep(retry_interval)
     while True:
         try:
-            return target.execute(sql, parameters)
-        except _RETRYABLE_ERRORS as e:
-            print(e)
-            time.sleep(retry_interval)
-            continue
-        except Error:
-            raise
+            return target.execute(sql, parameters, prepare=prepare)
+        except _RETRYABLE_ERRORS:
+            _LOGGER.warning("Retrying statement after a transient error", exc_info=True)
+            if not connection.autocommit:
+                connection.rollback()
+        time.sleep(retry_interval)
 
 
 def _reacquire_advisory_lock(
@@ -282,6 +414,7 @@ def ensure_schema(*, existing: Connection | None = None) -> None:
     if existing is None:
         existing = connect_pg(autocommit=False)
         close_after = True
+        _disable_lock_timeout(existing)
     try:
         with existing.cursor() as cur:
             cur.execute(
@@ -299,6 +432,24 @@ def ensure_schema(*, existing: Connection | None = None) -> None:
                 )
                 """
             )
+            # Discovery inserts grow ``players`` in bursts, and the default
+            # scale factor lets the planner statistics lag far behind on a
+            # large table, so autovacuum re-analyzes it after ~2% changes.
+            # The check skips the ALTER (and its lock) once it is set.
+            cur.execute(
+                """
+                SELECT 1 AS tuned
+                FROM pg_class
+                WHERE oid='players'::regclass
+                  AND %s = ANY(COALESCE(reloptions, ARRAY[]::TEXT[]))
+                """,
+                (f"autovacuum_analyze_scale_factor={PLAYERS_ANALYZE_SCALE_FACTOR}",),
+            )
+            if cur.fetchone() is None:
+                cur.execute(
+                    "ALTER TABLE players SET (autovacuum_analyze_scale_factor = "
+                    f"{PLAYERS_ANALYZE_SCALE_FACTOR})"
+                )
             cur.execute(
                 """
                 CREATE TABLE IF NOT EXISTS hero_stats (
@@ -329,6 +480,16 @@ def ensure_schema(*, existing: Connection | None = None) -> None:
                 )
                 """
             )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS player_counters (
+                    slot SMALLINT PRIMARY KEY,
+                    players_total BIGINT NOT NULL DEFAULT 0,
+                    hero_done BIGINT NOT NULL DEFAULT 0,
+                    discover_done BIGINT NOT NULL DEFAULT 0
+                )
+                """
+            )
             cur.execute(
                 """
                 CREATE TABLE IF NOT EXISTS progress_snapshots (
@@ -347,6 +508,17 @@ def ensure_schema(*, existing: Connection | None = None) -> None:
                 """,
                 (INITIAL_PLAYER_ID,),
             )
+            # Account 0 is a sentinel that is never crawled. The discovery queue
+            # excludes it, so close out its flags once here.
+            cur.execute(
+                """
+                UPDATE players
+                SET discover_done=TRUE,
+                    full_write_done=TRUE
+                WHERE steamAccountId=0
+                  AND (discover_done=FALSE OR full_write_done=FALSE)
+                """
+            )
     finally:
         if close_after:
             existing.commit()
@@ -358,6 +530,7 @@ def ensure_indexes(*, existing: Connection | None = None) -> None:
     if existing is None:
         existing = connect_pg(autocommit=False)
         close_after = True
+        _disable_lock_timeout(existing)
     try:
         with existing.cursor() as cur:
             # Retire obsolete indexes before creating the current set. This keeps the
@@ -428,9 +601,304 @@ def ensure_indexes(*, existing: Connection | None = None) -> None:
                     WHERE assigned_to IS NOT NULL
                 """
             )
-            # ``hero_top100`` tops out at roughly 20k rows (100 players per hero)
-            # so dedicated indexes are unnecessary. Sequential scans remain cheap
-            # while keeping rebuilds simple.
+            # ``hero_top100`` tops out at roughly 20k rows (100 players per hero).
+            # The ranking index lets the per-hero ``ORDER BY ... LIMIT`` lookups
+            # stop at the first matching entry instead of sorting each partition.
+            cur.execute(
+                """
+                -- stratz_scraper.web.leaderboard.fetch_hero_leaderboard and the
+                -- hero_top100_maintain trigger's threshold/eviction lookups
+                CREATE INDEX IF NOT EXISTS idx_hero_top100_rank
+                    ON hero_top100 (
+                        heroId,
+                        matches DESC,
+                        wins DESC,
+                        steamAccountId ASC
+                    )
+                """
+            )
+            cur.execute(
+                """
+                -- stratz_scraper.web.leaderboard.fetch_overall_leaderboard
+                CREATE INDEX IF NOT EXISTS idx_hero_top100_overall
+                    ON hero_top100 (
+                        matches DESC,
+                        wins DESC,
+                        steamAccountId ASC
+                    )
+                """
+            )
+    finally:
+        if close_after:
+            existing.commit()
+            existing.close()
+
+
+def _existing_triggers(cur: Cursor, table: str) -> set[str]:
+    rows = cur.execute(
+        """
+        SELECT tgname
+        FROM pg_trigger
+        WHERE tgrelid=to_regclass(%s)
+          AND NOT tgisinternal
+        """,
+        (table,),
+    ).fetchall()
+    return {row_value(row, "tgname") for row in rows}
+
+
+def ensure_triggers(*, existing: Connection | None = None) -> None:
+    close_after = False
+    if existing is None:
+        existing = connect_pg(autocommit=False)
+        close_after = True
+        _disable_lock_timeout(existing)
+    try:
+        with existing.cursor() as cur:
+            # Keeps ``hero_top100`` in sync with every ``hero_stats`` write so the
+            # submission path does not need to re-read the leaderboard and issue
+            # per-hero statements from Python. The triggers are statement-level:
+            # each statement first keeps only the rows that can enter (or
+            # already sit in) a hero's top 100, and only then takes the
+            # leaderboard advisory lock before touching the table. An upsert
+            # fires the insert and the update trigger one after the other, so
+            # a single lock (re-entered by the second trigger) rules out the
+            # lock-order deadlocks that per-hero locks taken by each trigger
+            # would allow. ``hero_stats`` rows are never deleted and only ever
+            # improve (see ``process_hero_submission``), so a row that does not
+            # qualify without the lock cannot qualify with it, and submissions
+            # that stay outside the top 100 never wait on the lock.
+            cur.execute(
+                f"""
+                CREATE OR REPLACE FUNCTION hero_top100_maintain() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+                DECLARE
+                    hero_ids INTEGER[];
+                    incoming RECORD;
+                    hero_count INTEGER;
+                    lowest RECORD;
+                BEGIN
+                    SELECT array_agg(DISTINCT candidate.heroId ORDER BY candidate.heroId)
+                    INTO hero_ids
+                    FROM new_rows AS candidate
+                    LEFT JOIN LATERAL (
+                        SELECT matches, wins
+                        FROM hero_top100
+                        WHERE heroId=candidate.heroId
+                        ORDER BY matches DESC, wins DESC, steamAccountId ASC
+                        OFFSET 99
+                        LIMIT 1
+                    ) threshold ON TRUE
+                    WHERE threshold.matches IS NULL
+                       OR candidate.matches > threshold.matches
+                       OR (
+                           candidate.matches = threshold.matches
+                           AND candidate.wins > threshold.wins
+                       )
+                       OR EXISTS (
+                           SELECT 1
+                           FROM hero_top100
+                           WHERE heroId=candidate.heroId
+                             AND steamAccountId=candidate.steamAccountId
+                       );
+                    IF hero_ids IS NULL THEN
+                        RETURN NULL;
+                    END IF;
+                    PERFORM pg_advisory_xact_lock(hashtext('hero_top100'));
+                    FOR incoming IN
+                        SELECT heroId, steamAccountId, matches, wins
+                        FROM new_rows
+                        WHERE heroId = ANY(hero_ids)
+                        ORDER BY heroId, matches DESC, wins DESC, steamAccountId ASC
+                    LOOP
+                        UPDATE hero_top100
+                        SET matches=incoming.matches, wins=incoming.wins
+                        WHERE heroId=incoming.heroId
+                          AND steamAccountId=incoming.steamAccountId;
+                        IF FOUND THEN
+                            PERFORM set_config('{HERO_TOP100_CHANGED_SETTING}', 'on', TRUE);
+                            CONTINUE;
+                        END IF;
+                        SELECT COUNT(*) INTO hero_count
+                        FROM hero_top100
+                        WHERE heroId=incoming.heroId;
+                        IF hero_count < 100 THEN
+                            INSERT INTO hero_top100 (heroId, steamAccountId, matches, wins)
+                            VALUES (
+                                incoming.heroId,
+                                incoming.steamAccountId,
+                                incoming.matches,
+                                incoming.wins
+                            );
+                            PERFORM set_config('{HERO_TOP100_CHANGED_SETTING}', 'on', TRUE);
+                            CONTINUE;
+                        END IF;
+                        SELECT steamAccountId, matches, wins INTO lowest
+                        FROM hero_top100
+                        WHERE heroId=incoming.heroId
+                        ORDER BY matches ASC, wins ASC, steamAccountId DESC
+                        LIMIT 1;
+                        IF incoming.matches > lowest.matches
+                           OR (
+                               incoming.matches = lowest.matches
+                               AND incoming.wins > lowest.wins
+                           ) THEN
+                            DELETE FROM hero_top100
+                            WHERE heroId=incoming.heroId
+                              AND steamAccountId=lowest.steamAccountId;
+                            INSERT INTO hero_top100 (heroId, steamAccountId, matches, wins)
+                            VALUES (
+                                incoming.heroId,
+                                incoming.steamAccountId,
+                                incoming.matches,
+                                incoming.wins
+                            );
+                            PERFORM set_config('{HERO_TOP100_CHANGED_SETTING}', 'on', TRUE);
+                        END IF;
+                    END LOOP;
+                    RETURN NULL;
+                END;
+                $$
+                """
+            )
+            # Trigger DDL locks ``hero_stats`` against writes, so existing
+            # triggers are left alone; the function above is replaced in place.
+            hero_triggers = _existing_triggers(cur, "hero_stats")
+            if "trg_hero_top100_maintain" in hero_triggers:
+                cur.execute("DROP TRIGGER trg_hero_top100_maintain ON hero_stats")
+            # Transition tables allow a single event per trigger and no column
+            # list, hence one trigger per event.
+            if "trg_hero_top100_insert" not in hero_triggers:
+                cur.execute(
+                    """
+                    CREATE TRIGGER trg_hero_top100_insert
+                    AFTER INSERT ON hero_stats
+                    REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION hero_top100_maintain()
+                    """
+                )
+            if "trg_hero_top100_update" not in hero_triggers:
+                cur.execute(
+                    """
+                    CREATE TRIGGER trg_hero_top100_update
+                    AFTER UPDATE ON hero_stats
+                    REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION hero_top100_maintain()
+                    """
+                )
+            # ``player_counters`` holds the /progress totals so the endpoint
+            # reads a handful of rows instead of scanning ``players``. Deltas
+            # land in one of several slots picked by backend pid so concurrent
+            # writers rarely queue on the same counter row. All three triggers
+            # are statement-level, so a bulk UPDATE such as the reset.py batches
+            # rewrites its slot once instead of once per row. Transition tables
+            # rule out an ``UPDATE OF`` column list, so statements that only
+            # touch assignment columns still run the join and find no delta.
+            cur.execute(
+                f"""
+                CREATE OR REPLACE FUNCTION player_counters_maintain() RETURNS trigger
+                LANGUAGE plpgsql AS $$
+                DECLARE
+                    delta_total BIGINT := 0;
+                    delta_hero BIGINT := 0;
+                    delta_discover BIGINT := 0;
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        SELECT
+                            COUNT(*),
+                            COUNT(*) FILTER (WHERE hero_done=TRUE),
+                            COUNT(*) FILTER (WHERE discover_done=TRUE)
+                        INTO delta_total, delta_hero, delta_discover
+                        FROM new_rows;
+                    ELSIF TG_OP = 'DELETE' THEN
+                        SELECT
+                            -COUNT(*),
+                            -COUNT(*) FILTER (WHERE hero_done=TRUE),
+                            -COUNT(*) FILTER (WHERE discover_done=TRUE)
+                        INTO delta_total, delta_hero, delta_discover
+                        FROM old_rows;
+                    ELSE
+                        SELECT
+                            COALESCE(SUM(
+                                (new_rows.hero_done IS TRUE)::INTEGER
+                                - (old_rows.hero_done IS TRUE)::INTEGER
+                            ), 0),
+                            COALESCE(SUM(
+                                (new_rows.discover_done IS TRUE)::INTEGER
+                                - (old_rows.discover_done IS TRUE)::INTEGER
+                            ), 0)
+                        INTO delta_hero, delta_discover
+                        FROM old_rows
+                        JOIN new_rows USING (steamAccountId)
+                        WHERE old_rows.hero_done IS DISTINCT FROM new_rows.hero_done
+                           OR old_rows.discover_done IS DISTINCT FROM new_rows.discover_done;
+                    END IF;
+                    IF delta_total <> 0 OR delta_hero <> 0 OR delta_discover <> 0 THEN
+                        UPDATE player_counters
+                        SET players_total=players_total + delta_total,
+                            hero_done=hero_done + delta_hero,
+                            discover_done=discover_done + delta_discover
+                        WHERE slot=pg_backend_pid() % {PLAYER_COUNTER_SLOTS};
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$
+                """
+            )
+            cur.execute("DROP TRIGGER IF EXISTS trg_player_counters_insert ON players")
+            cur.execute("DROP TRIGGER IF EXISTS trg_player_counters_update ON players")
+            cur.execute("DROP TRIGGER IF EXISTS trg_player_counters_delete ON players")
+            cur.execute(
+                """
+                CREATE TRIGGER trg_player_counters_insert
+                AFTER INSERT ON players
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION player_counters_maintain()
+                """
+            )
+            cur.execute(
+                """
+                CREATE TRIGGER trg_player_counters_update
+                AFTER UPDATE ON players
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION player_counters_maintain()
+                """
+            )
+            cur.execute(
+                """
+                CREATE TRIGGER trg_player_counters_delete
+                AFTER DELETE ON players
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION player_counters_maintain()
+                """
+            )
+            # Creating the triggers locks ``players`` against writes until this
+            # transaction commits, so the initial count cannot miss a delta.
+            cur.execute("SELECT 1 FROM player_counters LIMIT 1")
+            if cur.fetchone() is None:
+                cur.execute(
+                    """
+                    INSERT INTO player_counters (
+                        slot,
+                        players_total,
+                        hero_done,
+                        discover_done
+                    )
+                    SELECT
+                        0,
+                        COUNT(*),
+                        COUNT(*) FILTER (WHERE hero_done=TRUE),
+                        COUNT(*) FILTER (WHERE discover_done=TRUE)
+                    FROM players
+                    """
+                )
+                cur.execute(
+                    """
+                    INSERT INTO player_counters (slot)
+                    SELECT generate_series(1, %s::integer)
+                    """,
+                    (PLAYER_COUNTER_SLOTS - 1,),
+                )
     finally:
         if close_after:
             existing.commit()
@@ -447,6 +915,7 @@ def refresh_leaderboard_views(*, concurrently: bool = True) -> None:
     connection: Connection | None = None
     try:
         connection = _create_connection(autocommit=False)
+        _disable_lock_timeout(connection)
         with connection.cursor() as cur:
             retryable_execute(cur, "DELETE FROM public.hero_top100")
             retryable_execute(
@@ -517,10 +986,12 @@ __all__ = [
     "ensure_schema_exists",
     "ensure_schema",
     "ensure_indexes",
+    "ensure_triggers",
     "refresh_leaderboard_views",
     "release_incomplete_assignments",
     "retryable_execute",
     "retryable_executemany",
+    "HERO_TOP100_CHANGED_SETTING",
     "INITIAL_PLAYER_ID",
     "DATABASE_URL",
 ]
@@ -139,5 +139,8 @@ HERO_SLUGS: Dict[str, Tuple[int, str]] = {
     hero_slug(hero["localized_name"]): (hero["id"], hero["localized_name"])
     for hero in HEROES_JSON
 }
+HERO_ID_TO_NAME_SLUG: Dict[int, Tuple[str, str]] = {
+    hero_id: (name, hero_slug(name)) for hero_id, name in HEROES.items()
+}
 
-__all__ = ["HEROES", "HEROES_JSON", "HERO_SLUGS", "hero_slug"]
+__all__ = ["HEROES", "HEROES_JSON", "HERO_ID_TO_NAME_SLUG", "HERO_SLUGS", "hero_slug"]
@@ -15,6 +15,7 @@ from ..database import (
 from .assignment import (
     ASSIGNMENT_RETRY_INTERVAL,
     assign_next_task,
+    claim_next_task,
     ensure_assignment_cleanup_scheduler,
 )
 from .config import STATIC_DIR, TEMPLATE_DIR
@@ -29,12 +30,17 @@ from .progress import (
     list_progress_snapshots,
 )
 from .request_utils import is_local_request
+from .response_cache import cached_json_response, cached_value
 from .seed import seed_players
 from .submissions import submit_discover_submission, submit_hero_submission
 from .tasks import reset_player_task
 
 __all__ = ["create_app"]
 
+PROGRESS_CACHE_TTL = 2.0
+BEST_CACHE_TTL = 30.0
+LEADERBOARD_CACHE_TTL = 30.0
+
 
 def create_app() -> Flask:
     app = Flask(
@@ -133,6 +139,7 @@ def create_app() -> Flask:
                 heroes_payload = data.get("heroes", [])
                 players_payload.append((steam_account_id, heroes_payload))
             next_task = None
+            apply_claim = None
             successful_payloads: list[tuple[int, object]] = []
             try:
                 with db_connection(write=True) as conn:
@@ -160,12 +167,14 @@ def create_app() -> Flask:
                             raise LookupError
                         successful_payloads.append((steam_account_id, heroes_payload))
                     if request_new_task:
-                        next_task = assign_next_task(connection=conn)
+                        next_task, apply_claim = claim_next_task(conn)
             except LookupError:
                 return (
                     jsonify({"status": "error", "message": "Player not found"}),
                     404,
                 )
+            if apply_claim is not None:
+                apply_claim()
             for steam_account_id, heroes_payload in successful_payloads:
                 submit_hero_submission(
                     steam_account_id,
@@ -237,6 +246,7 @@ def create_app() -> Flask:
             retain_assignment = data.get("retainAssignment") is True
             assignment_depth = None
             next_task = None
+            apply_claim = None
             with db_connection(write=True) as conn:
                 cur = conn.cursor()
                 set_clauses = [
@@ -278,7 +288,9 @@ def create_app() -> Flask:
                     )
                 assignment_depth = update_row["depth"] if update_row is not None else None
                 if request_new_task:
-                    next_task = assign_next_task(connection=conn)
+                    next_task, apply_claim = claim_next_task(conn)
+            if apply_claim is not None:
+                apply_claim()
             if has_discovered_accounts:
                 submit_discover_submission(
                     steam_account_id,
@@ -295,7 +307,14 @@ def create_app() -> Flask:
 
     @app.get("/progress")
     def progress():
-        return jsonify(fetch_progress())
+        # The counters move with every submission, so /progress only expires
+        # with its TTL instead of being dropped on each hero submission.
+        return cached_json_response(
+            "progress",
+            PROGRESS_CACHE_TTL,
+            fetch_progress,
+            versioned=False,
+        )
 
     def _parse_time_param(value: str | None) -> datetime | None:
         if value is None or value.strip() == "":
@@ -362,7 +381,11 @@ def create_app() -> Flask:
     @app.get("/leaderboards")
     @app.get("/leaderboards/")
     def leaderboards():
-        players = fetch_overall_leaderboard()
+        players = cached_value(
+            "overall-leaderboard",
+            LEADERBOARD_CACHE_TTL,
+            fetch_overall_leaderboard,
+        )
         return render_template(
             "leaderboard.html",
             hero_name="Overall",
@@ -391,6 +414,6 @@ def create_app() -> Flask:
 
     @app.get("/best")
     def best():
-        return jsonify(fetch_best_payload())
+        return cached_json_response("best", BEST_CACHE_TTL, fetch_best_payload)
 
     return app
@@ -2,28 +2,45 @@
 
 from __future__ import annotations
 
+import atexit
 import logging
+import queue
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Final
+from functools import partial
+from typing import Callable, Final
+
+from psycopg.rows import tuple_row
 
 from ..database import (
     db_connection,
     release_incomplete_assignments,
     retryable_execute,
-    row_value,
 )
+from .scheduler import schedule_periodic
 
 ASSIGNMENT_CLEANUP_KEY = "last_assignment_cleanup"
 HERO_ASSIGNMENT_CURSOR_KEY = "hero_assignment_cursor"
+TASK_ASSIGNMENT_COUNTER_KEY = "task_assignment_counter"
+COUNTER_FLUSH_INTERVAL: Final[int] = 100
 ASSIGNMENT_CLEANUP_INTERVAL = timedelta(seconds=60)
+ASSIGNMENT_STATE_FLUSH_INTERVAL = timedelta(seconds=30)
 ASSIGNMENT_RETRY_INTERVAL = 0.05
 MAX_HERO_TASK_SIZE: Final[int] = 5
 MAX_DISCOVERY_TASK_SIZE: Final[int] = 5
+MAX_COMBINED_ASSIGNMENTS: Final[int] = 16
+DISCOVERY_BACKLOG_LIMIT: Final[int] = 100
+DISCOVERY_BACKLOG_TTL: Final[float] = 5.0
+ASSIGNMENT_WAIT_TIMEOUT: Final[float] = 30.0
 
 _LOGGER = logging.getLogger(__name__)
 
+# Bound once so the cleanup check skips repeated attribute lookups.
+_UTC = timezone.utc
+_DATETIME_NOW = datetime.now
+_FROMISO = datetime.fromisoformat
+
 
 class _DiscoveryThrottle:
     """Sentinel object returned when discovery assignment is throttled."""
@@ -33,69 +50,119 @@ class _DiscoveryThrottle:
 
 _DISCOVERY_THROTTLED: Final = _DiscoveryThrottle()
 
-_cleanup_thread: threading.Thread | None = None
-_cleanup_stop_event: threading.Event | None = None
-_cleanup_lock = threading.Lock()
 
-_restart_executor = ThreadPoolExecutor(max_workers=1)
-_RESTART_LOCK_ID = int.from_bytes(b"restart", "big")
+class _AssignmentState:
+    """In-process side effects of a claim, applied once it has committed."""
+
+    __slots__ = ("assigned", "hero_cursor", "hero_cursor_generation")
+
+    def __init__(self) -> None:
+        self.assigned = 0
+        self.hero_cursor: int | None = None
+        self.hero_cursor_generation = 0
+
+_CLEANUP_INTERVAL_SECONDS = ASSIGNMENT_CLEANUP_INTERVAL.total_seconds()
+_last_cleanup_mono = 0.0
+_cleanup_ts_lock = threading.Lock()
+_parsed_last_cleanup: tuple[str, datetime] | None = None
+
+_counter_lock = threading.Lock()
+_counter_pending = 0
+
+_backlog_cache: tuple[int, bool] | None = None
+
+_hero_cursor: int | None = None
+# Bumped by every reset so a claim that read the cursor earlier cannot move it
+# past players discovered in the meantime.
+_hero_cursor_generation = 0
+_hero_cursor_lock = threading.Lock()
+
+_combiner_queue: "queue.SimpleQueue[_AssignmentRequest]" = queue.SimpleQueue()
+_combiner_thread: threading.Thread | None = None
+_combiner_start_lock = threading.Lock()
 
 __all__ = [
     "ASSIGNMENT_CLEANUP_INTERVAL",
     "ASSIGNMENT_CLEANUP_KEY",
     "assign_next_task",
+    "claim_next_task",
     "ensure_assignment_cleanup_scheduler",
+    "flush_assignment_state",
     "maybe_run_assignment_cleanup",
+    "reset_hero_assignment_cursor",
 ]
 
 
-def _cleanup_worker(stop_event: threading.Event) -> None:
-    interval_seconds = max(int(ASSIGNMENT_CLEANUP_INTERVAL.total_seconds()), 1)
-    while not stop_event.is_set():
-        try:
-            with db_connection(write=True) as conn:
-                maybe_run_assignment_cleanup(conn)
-        except Exception:  # pragma: no cover - best effort logging
-            _LOGGER.exception("Assignment cleanup worker failed")
-        stop_event.wait(interval_seconds)
+def _run_assignment_cleanup() -> None:
+    with db_connection(write=True) as conn:
+        maybe_run_assignment_cleanup(conn)
 
 
 def ensure_assignment_cleanup_scheduler() -> None:
-    """Start the background worker that periodically releases stale assignments."""
+    """Register the periodic jobs that release stale assignments and persist
+    the buffered assignment state."""
+
+    interval_seconds = max(int(_CLEANUP_INTERVAL_SECONDS), 1)
+    schedule_periodic(
+        "assignment-cleanup",
+        _run_assignment_cleanup,
+        lambda: interval_seconds,
+    )
+    # Quiet periods never reach ``COUNTER_FLUSH_INTERVAL``, so buffered ticks
+    # and cursor moves are also written out on a timer.
+    flush_seconds = ASSIGNMENT_STATE_FLUSH_INTERVAL.total_seconds()
+    schedule_periodic(
+        "assignment-state-flush",
+        flush_assignment_state,
+        lambda: flush_seconds,
+        initial_delay=flush_seconds,
+    )
+
+
+def _parse_cleanup_timestamp(raw_value: str) -> datetime:
+    global _parsed_last_cleanup
+    cached = _parsed_last_cleanup
+    if cached is not None and cached[0] == raw_value:
+        return cached[1]
+    parsed = _FROMISO(raw_value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=_UTC)
+    _parsed_last_cleanup = (raw_value, parsed)
+    return parsed
 
-    global _cleanup_thread, _cleanup_stop_event
-    with _cleanup_lock:
-        if _cleanup_thread and _cleanup_thread.is_alive():
-            return
-        stop_event = threading.Event()
-        thread = threading.Thread(
-            target=_cleanup_worker,
-            args=(stop_event,),
-            name="assignment-cleanup",
-            daemon=True,
-        )
-        thread.start()
-        _cleanup_thread = thread
-        _cleanup_stop_event = stop_event
 
+def maybe_run_assignment_cleanup(conn, cur=None) -> bool:
+    """Release stale assignments if the cleanup interval has elapsed.
 
-def maybe_run_assignment_cleanup(conn) -> bool:
-    """Release stale assignments if the cleanup interval has elapsed."""
-    cur = conn.cursor()
-    now = datetime.now(timezone.utc)
+    Callers that already hold a cursor on ``conn`` can pass it as ``cur``.
+    """
+    global _last_cleanup_mono
+    now_mono = time.monotonic()
+    with _cleanup_ts_lock:
+        # A cleanup this process ran (or observed) recently settles the check
+        # without a round-trip to ``meta``.
+        if (
+            _last_cleanup_mono
+            and now_mono - _last_cleanup_mono < _CLEANUP_INTERVAL_SECONDS
+        ):
+            return False
+    if cur is None:
+        cur = conn.cursor()
+    now = _DATETIME_NOW(_UTC)
     last_cleanup_row = cur.execute(
         "SELECT value FROM meta WHERE key=%s",
         (ASSIGNMENT_CLEANUP_KEY,),
     ).fetchone()
     if last_cleanup_row:
         try:
-            last_cleanup = datetime.fromisoformat(last_cleanup_row["value"])
+            last_cleanup = _parse_cleanup_timestamp(last_cleanup_row["value"])
         except (TypeError, ValueError):
             pass
         else:
-            if last_cleanup.tzinfo is None:
-                last_cleanup = last_cleanup.replace(tzinfo=timezone.utc)
-            if now - last_cleanup < ASSIGNMENT_CLEANUP_INTERVAL:
+            elapsed = now - last_cleanup
+            if elapsed < ASSIGNMENT_CLEANUP_INTERVAL:
+                with _cleanup_ts_lock:
+                    _last_cleanup_mono = now_mono - max(elapsed.total_seconds(), 0.0)
                 return False
     release_incomplete_assignments(existing=conn)
     retryable_execute(
@@ -108,105 +175,106 @@ def maybe_run_assignment_cleanup(conn) -> bool:
         (ASSIGNMENT_CLEANUP_KEY, now.isoformat()),
         retry_interval=ASSIGNMENT_RETRY_INTERVAL,
     )
+    with _cleanup_ts_lock:
+        _last_cleanup_mono = now_mono
     return True
 
 
 def _discovery_backlog_exceeded(cur) -> bool:
+    global _backlog_cache
+    bucket = int(time.monotonic() // DISCOVERY_BACKLOG_TTL)
+    cached = _backlog_cache
+    if cached is not None and cached[0] == bucket:
+        return cached[1]
+
+    # Probing for the 101st row lets the scan stop early instead of counting
+    # the whole backlog.
     backlog_row = retryable_execute(
         cur,
         """
-        SELECT COUNT(*) AS backlog
+        SELECT 1 AS present
         FROM players
         WHERE discover_done=TRUE
           AND full_write_done=FALSE
           AND highest_match_id IS NOT NULL
+        LIMIT 1 OFFSET %s
         """,
+        (DISCOVERY_BACKLOG_LIMIT,),
         retry_interval=ASSIGNMENT_RETRY_INTERVAL,
     ).fetchone()
+    exceeded = backlog_row is not None
+    _backlog_cache = (bucket, exceeded)
+    return exceeded
 
-    try:
-        backlog_count = int(row_value(backlog_row, "backlog")) if backlog_row else 0
-    except (TypeError, ValueError):
-        backlog_count = 0
 
-    return backlog_count > 100
+def _assign_discovery_batch(cur, count: int) -> list[dict] | _DiscoveryThrottle:
+    """Claim discovery work for up to ``count`` tasks with one locked fetch.
 
+    Players are split into tasks of ``MAX_DISCOVERY_TASK_SIZE`` in depth
+    order, so the shallowest accounts still go out first.
+    """
 
-def _assign_discovery(cur) -> dict | _DiscoveryThrottle | None:
     if _discovery_backlog_exceeded(cur):
         return _DISCOVERY_THROTTLED
 
-    assigned_rows = retryable_execute(
-        cur,
-        """
-        WITH candidate AS (
+    with cur.connection.cursor(row_factory=tuple_row) as tuple_cur:
+        assigned_rows = retryable_execute(
+            tuple_cur,
+            """
+            WITH candidate AS (
+                SELECT steamAccountId, depth, highest_match_id
+                FROM players
+                WHERE hero_done=TRUE
+                  AND discover_done=FALSE
+                  AND assigned_to IS NULL
+                  AND steamAccountId <> 0
+                ORDER BY depth ASC,
+                         steamAccountId ASC
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ),
+            updated AS (
+                UPDATE players
+                SET assigned_to='discover',
+                    assigned_at=CURRENT_TIMESTAMP
+                WHERE steamAccountId IN (SELECT steamAccountId FROM candidate)
+                  AND assigned_to IS NULL
+                RETURNING steamAccountId, depth, highest_match_id
+            )
             SELECT steamAccountId, depth, highest_match_id
-            FROM players
-            WHERE hero_done=TRUE
-              AND discover_done=FALSE
-              AND assigned_to IS NULL
-            ORDER BY depth ASC,
-                     steamAccountId ASC
-            LIMIT %s
-            FOR UPDATE SKIP LOCKED
-        )
-        UPDATE players
-        SET assigned_to='discover',
-            assigned_at=CURRENT_TIMESTAMP
-        WHERE steamAccountId IN (SELECT steamAccountId FROM candidate)
-          AND assigned_to IS NULL
-        RETURNING steamAccountId, depth, highest_match_id
-        """,
-        (MAX_DISCOVERY_TASK_SIZE,),
-        retry_interval=ASSIGNMENT_RETRY_INTERVAL,
-    ).fetchall()
+            FROM updated
+            ORDER BY depth ASC, steamAccountId ASC
+            """,
+            (count * MAX_DISCOVERY_TASK_SIZE,),
+            retry_interval=ASSIGNMENT_RETRY_INTERVAL,
+            prepare=True,
+        ).fetchall()
 
     if not assigned_rows:
-        return None
-
-    players: list[dict] = []
-    for assigned in assigned_rows:
-        steam_account_id_raw = row_value(assigned, "steamAccountId")
-        try:
-            steam_account_id = int(steam_account_id_raw)
-        except (TypeError, ValueError):
-            continue
-        if steam_account_id == 0:
-            cur.execute(
-                "UPDATE players SET discover_done=TRUE, full_write_done=TRUE WHERE steamAccountId=0"
-            )
-            continue
-
-        depth_value = row_value(assigned, "depth")
-        try:
-            depth = int(depth_value)
-        except (TypeError, ValueError):
-            depth = None
-
-        highest_match_id_value = row_value(assigned, "highest_match_id")
-        try:
-            highest_match_id = (
-                int(highest_match_id_value)
-                if highest_match_id_value is not None
+        return []
+
+    # Integer columns already arrive as ``int``; only the sentinel for an
+    # unknown highest match id needs normalizing.
+    players = [
+        {
+            "steamAccountId": steam_account_id,
+            "depth": depth,
+            "highestMatchId": (
+                highest_match_id
+                if highest_match_id is not None and highest_match_id >= 0
                 else None
-            )
-        except (TypeError, ValueError):
-            highest_match_id = None
-        if highest_match_id is not None and highest_match_id < 0:
-            highest_match_id = None
+            ),
+        }
+        for steam_account_id, depth, highest_match_id in assigned_rows
+    ]
 
-        players.append(
-            {
-                "steamAccountId": steam_account_id,
-                "depth": depth,
-                "highestMatchId": highest_match_id,
-            }
-        )
+    return [
+        _discovery_payload(players[offset : offset + MAX_DISCOVERY_TASK_SIZE])
+        for offset in range(0, len(players), MAX_DISCOVERY_TASK_SIZE)
+    ]
 
-    if not players:
-        return _assign_discovery(cur)
 
-    players.sort(key=lambda entry: (entry.get("depth") or 0, entry["steamAccountId"]))
+def _discovery_payload(players: list[dict]) -> dict:
     steam_account_ids = [player["steamAccountId"] for player in players]
     payload = {
         "type": "discover_matches",
@@ -222,172 +290,299 @@ def _assign_discovery(cur) -> dict | _DiscoveryThrottle | None:
         payload["highestMatchId"] = first_highest
     return payload
 
-def _restart_discovery_cycle(cur) -> bool:
-    cur.execute(f"SELECT pg_try_advisory_xact_lock({_RESTART_LOCK_ID})")
-    if not cur.fetchone()[0]:
-        return True
 
-    def _task():
-        retryable_execute(
-            cur,
-            """
-            UPDATE players
-            SET discover_done=FALSE,
-                full_write_done=FALSE,
-                assigned_at=CASE WHEN assigned_to='discover' THEN NULL ELSE assigned_at END,
-                assigned_to=CASE WHEN assigned_to='discover' THEN NULL ELSE assigned_to END
-            """,
-            retry_interval=ASSIGNMENT_RETRY_INTERVAL,
-        )
+def _assign_discovery(cur) -> dict | _DiscoveryThrottle | None:
+    payloads = _assign_discovery_batch(cur, 1)
+    if payloads is _DISCOVERY_THROTTLED:
+        return _DISCOVERY_THROTTLED
+    return payloads[0] if payloads else None
 
-    _restart_executor.submit(_task)
-    return True
 
-def _assign_next_hero(cur) -> dict | None:
-    last_cursor_row = retryable_execute(
+def _load_hero_cursor(cur) -> tuple[int, int]:
+    """Return the hero cursor together with its reset generation."""
+
+    global _hero_cursor
+    with _hero_cursor_lock:
+        if _hero_cursor is not None:
+            return _hero_cursor, _hero_cursor_generation
+    row = retryable_execute(
         cur,
         "SELECT value FROM meta WHERE key=%s",
         (HERO_ASSIGNMENT_CURSOR_KEY,),
         retry_interval=ASSIGNMENT_RETRY_INTERVAL,
     ).fetchone()
     try:
-        last_cursor = int(last_cursor_row["value"]) if last_cursor_row else 0
+        value = int(row["value"]) if row else 0
     except (TypeError, ValueError):
-        last_cursor = 0
+        value = 0
+    with _hero_cursor_lock:
+        if _hero_cursor is None:
+            _hero_cursor = value
+        return _hero_cursor, _hero_cursor_generation
 
-    for _ in range(2):
-        assigned_rows = retryable_execute(
-            cur,
-            """
-            WITH candidate AS (
-                SELECT steamAccountId
-                FROM players
-                WHERE hero_done=FALSE
-                  AND assigned_to IS NULL
-                  AND steamAccountId > %s
-                ORDER BY steamAccountId ASC
-                LIMIT %s
-                FOR UPDATE SKIP LOCKED
-            ),
-            fallback AS (
-                SELECT steamAccountId
-                FROM players
-                WHERE hero_done=FALSE
-                  AND assigned_to IS NULL
-                  AND steamAccountId > 0
-                ORDER BY steamAccountId ASC
-                LIMIT %s
-                FOR UPDATE SKIP LOCKED
-            ),
-            selected AS (
-                SELECT steamAccountId FROM candidate
-                UNION ALL
-                SELECT steamAccountId FROM fallback
-                WHERE NOT EXISTS (SELECT 1 FROM candidate)
-                LIMIT %s
-            )
-            UPDATE players
-            SET assigned_to='hero',
-                assigned_at=CURRENT_TIMESTAMP
-            WHERE steamAccountId IN (SELECT steamAccountId FROM selected)
-              AND hero_done=FALSE
-              AND assigned_to IS NULL
-            RETURNING steamAccountId
-            """,
-            (
-                last_cursor,
-                MAX_HERO_TASK_SIZE,
-                MAX_HERO_TASK_SIZE,
-                MAX_HERO_TASK_SIZE,
-            ),
-            retry_interval=ASSIGNMENT_RETRY_INTERVAL,
-        ).fetchall()
-        if assigned_rows:
-            steam_account_ids = sorted(
-                {
-                    int(row_value(assigned_row, "steamAccountId"))
-                    for assigned_row in assigned_rows
-                }
-            )
-            if not steam_account_ids:
-                continue
-            steam_account_id = steam_account_ids[-1]
-            retryable_execute(
-                cur,
+
+def reset_hero_assignment_cursor() -> None:
+    """Rewind the hero cursor so lower ids are scanned again.
+
+    Like every other cursor move this only touches the in-process value; it
+    reaches ``meta`` with the next ``_flush_assignment_state``. Claims that
+    read the cursor before the reset no longer advance it.
+    """
+
+    global _hero_cursor, _hero_cursor_generation
+    with _hero_cursor_lock:
+        _hero_cursor = -1
+        _hero_cursor_generation += 1
+
+
+def _assign_hero_batch(cur, count: int, state: _AssignmentState) -> list[dict]:
+    """Claim hero work for up to ``count`` tasks with one locked fetch.
+
+    Rows are locked and marked in a single ``FOR UPDATE SKIP LOCKED`` statement
+    and then split into tasks of ``MAX_HERO_TASK_SIZE`` players. An empty list
+    means no hero work is available. The advanced cursor is left on ``state``.
+    """
+
+    limit = count * MAX_HERO_TASK_SIZE
+    last_cursor, generation = _load_hero_cursor(cur)
+    claimed: list[int] = []
+    # The ``fallback`` branch wraps around to the start of the queue once the
+    # cursor passes the last pending player. A second pass is only needed when
+    # the first one stopped at the end of the range with tasks still unfilled.
+    with cur.connection.cursor(row_factory=tuple_row) as tuple_cur:
+        for _ in range(2):
+            remaining = limit - len(claimed)
+            assigned_rows = retryable_execute(
+                tuple_cur,
                 """
-                INSERT INTO meta (key, value)
-                VALUES (%s, %s)
-                ON CONFLICT(key) DO UPDATE SET value=excluded.value
+                WITH candidate AS (
+                    SELECT steamAccountId
+                    FROM players
+                    WHERE hero_done=FALSE
+                      AND assigned_to IS NULL
+                      AND steamAccountId > %s
+                    ORDER BY steamAccountId ASC
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ),
+                fallback AS (
+                    SELECT steamAccountId
+                    FROM players
+                    WHERE hero_done=FALSE
+                      AND assigned_to IS NULL
+                      AND steamAccountId > 0
+                    ORDER BY steamAccountId ASC
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ),
+                selected AS (
+                    SELECT steamAccountId FROM candidate
+                    UNION ALL
+                    SELECT steamAccountId FROM fallback
+                    WHERE NOT EXISTS (SELECT 1 FROM candidate)
+                    LIMIT %s
+                )
+                UPDATE players
+                SET assigned_to='hero',
+                    assigned_at=CURRENT_TIMESTAMP
+                WHERE steamAccountId IN (SELECT steamAccountId FROM selected)
+                  AND hero_done=FALSE
+                  AND assigned_to IS NULL
+                RETURNING steamAccountId
                 """,
-                (HERO_ASSIGNMENT_CURSOR_KEY, str(steam_account_id)),
+                (last_cursor, remaining, remaining, remaining),
                 retry_interval=ASSIGNMENT_RETRY_INTERVAL,
-            )
-            return {
+                prepare=True,
+            ).fetchall()
+            if not assigned_rows:
+                break
+            steam_account_ids = sorted(row[0] for row in assigned_rows)
+            claimed.extend(steam_account_ids)
+            last_cursor = steam_account_ids[-1]
+            if len(claimed) > limit - MAX_HERO_TASK_SIZE:
+                break
+    if not claimed:
+        return []
+    # The cursor moves once the claim has committed and is persisted together
+    # with the buffered counter in ``_flush_assignment_state``.
+    state.hero_cursor = last_cursor
+    state.hero_cursor_generation = generation
+    payloads: list[dict] = []
+    for offset in range(0, len(claimed), MAX_HERO_TASK_SIZE):
+        chunk = sorted(claimed[offset : offset + MAX_HERO_TASK_SIZE])
+        payloads.append(
+            {
                 "type": "fetch_hero_stats",
-                "steamAccountId": steam_account_ids[0],
-                "steamAccountIds": steam_account_ids,
+                "steamAccountId": chunk[0],
+                "steamAccountIds": chunk,
             }
+        )
+    return payloads
 
-    return None
 
+def _assign_next_hero(cur, state: _AssignmentState) -> dict | None:
+    payloads = _assign_hero_batch(cur, 1, state)
+    return payloads[0] if payloads else None
 
-def assign_next_task(
-    *,
-    run_cleanup: bool = False,
-    connection=None,
-) -> dict | None:
+
+def assign_next_task(*, run_cleanup: bool = False) -> dict | None:
     """Select the next task to hand to a worker.
 
-    When ``connection`` is provided the caller is responsible for committing or
-    rolling back the surrounding transaction. Otherwise a managed write
-    connection is opened for the duration of the scheduler work.
+    The request is handed to the assignment combiner, which serves concurrent
+    callers from a single managed write transaction.
     """
 
-    if connection is None:
-        with db_connection(write=True) as managed_conn:
-            return _assign_next_task_on_connection(
-                managed_conn,
-                run_cleanup=run_cleanup,
-            )
-    return _assign_next_task_on_connection(connection, run_cleanup=run_cleanup)
+    if not run_cleanup:
+        return _combine_assignment()
+    state = _AssignmentState()
+    with db_connection(write=True) as managed_conn:
+        payload = _assign_next_task_on_connection(
+            managed_conn,
+            run_cleanup=run_cleanup,
+            state=state,
+        )
+    _apply_assignment_state(state)
+    return payload
 
 
-def _assign_next_task_on_connection(connection, *, run_cleanup: bool) -> dict | None:
-    if run_cleanup:
-        maybe_run_assignment_cleanup(connection)
+def claim_next_task(connection) -> tuple[dict | None, Callable[[], None]]:
+    """Claim the next task inside the caller's transaction on ``connection``.
 
-    with connection.cursor() as cur:
-        counter_row = cur.execute(
-            "SELECT value FROM meta WHERE key=%s",
-            ("task_assignment_counter",),
-        ).fetchone()
+    Returns the payload together with a callback that applies the claim's
+    in-process side effects. The caller must invoke it only after committing
+    the transaction, so a rolled back claim never moves the hero cursor or
+    the assignment counter.
+    """
+
+    state = _AssignmentState()
+    payload = _assign_next_task_on_connection(
+        connection,
+        run_cleanup=False,
+        state=state,
+    )
+    return payload, partial(_apply_assignment_state, state)
+
+
+class _AssignmentRequest:
+    """A pending ``assign_next_task`` call waiting on the combiner."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: dict | None = None
+        self.error: BaseException | None = None
+
+
+def _combiner_worker() -> None:
+    while True:
+        batch = [_combiner_queue.get()]
+        while len(batch) < MAX_COMBINED_ASSIGNMENTS:
+            try:
+                batch.append(_combiner_queue.get_nowait())
+            except queue.Empty:
+                break
+        results: list[dict | None] = []
+        state = _AssignmentState()
         try:
-            current_count = int(counter_row["value"]) if counter_row else 0
-        except (TypeError, ValueError):
-            current_count = 0
+            # One transaction serves every queued caller. Results, the hero
+            # cursor and the counter are only applied once the commit succeeded.
+            with db_connection(write=True) as conn:
+                with conn.cursor() as cur:
+                    _assign_batch(cur, len(batch), results, state)
+        except BaseException as exc:  # propagated to every caller in the batch
+            for pending in batch:
+                pending.error = exc
+                pending.done.set()
+            if not isinstance(exc, Exception):
+                raise
+            continue
+        for pending, result in zip(batch, results):
+            pending.result = result
+            pending.done.set()
+        _apply_assignment_state(state)
+
+
+def _assign_batch(
+    cur,
+    count: int,
+    results: list[dict | None],
+    state: _AssignmentState,
+) -> None:
+    """Fill ``results`` with ``count`` assignments, claiming each stage in bulk.
+
+    Mirrors :func:`_assign_next_task_on_connection`: hero work first, then
+    discovery, then refreshes, with a throttled discovery stage leaving the
+    remaining callers without a task.
+    """
 
-        candidate_payload = _assign_next_hero(cur)
+    for payload in _assign_hero_batch(cur, count, state):
+        state.assigned += 1
+        results.append(payload)
+    if len(results) < count:
+        discovered = _assign_discovery_batch(cur, count - len(results))
+        if discovered is _DISCOVERY_THROTTLED:
+            results.extend([None] * (count - len(results)))
+            return
+        for payload in discovered:
+            state.assigned += 1
+            results.append(payload)
+    while len(results) < count:
+        payload = _assign_refresh(cur)
+        if payload is None:
+            results.extend([None] * (count - len(results)))
+            return
+        state.assigned += 1
+        results.append(payload)
 
-        if candidate_payload is None:
-            candidate_payload = _assign_discovery(cur)
-            if candidate_payload is _DISCOVERY_THROTTLED:
-                return None
 
-        if candidate_payload is None:
-            assigned_rows = retryable_execute(
-                cur,
-                """
-                WITH candidate AS (
-                    SELECT steamAccountId
-                    FROM players
-                    WHERE hero_done=TRUE
-                      AND discover_done=TRUE
-                      AND assigned_to IS NULL
-                    ORDER BY hero_refreshed_at ASC NULLS FIRST,
-                             steamAccountId ASC
-                    LIMIT %s
-                    FOR UPDATE SKIP LOCKED
-                )
+def _ensure_combiner() -> None:
+    global _combiner_thread
+    if _combiner_thread and _combiner_thread.is_alive():
+        return
+    with _combiner_start_lock:
+        if _combiner_thread and _combiner_thread.is_alive():
+            return
+        thread = threading.Thread(
+            target=_combiner_worker,
+            name="assignment-combiner",
+            daemon=True,
+        )
+        thread.start()
+        _combiner_thread = thread
+
+
+def _combine_assignment() -> dict | None:
+    """Queue an assignment so concurrent callers share one transaction."""
+
+    _ensure_combiner()
+    pending = _AssignmentRequest()
+    _combiner_queue.put(pending)
+    if not pending.done.wait(ASSIGNMENT_WAIT_TIMEOUT):
+        # The claim may still land later; stale assignment cleanup releases it.
+        raise TimeoutError("Timed out waiting for the assignment combiner")
+    if pending.error is not None:
+        raise pending.error
+    return pending.result
+
+
+def _assign_refresh(cur) -> dict | None:
+    with cur.connection.cursor(row_factory=tuple_row) as tuple_cur:
+        assigned_rows = retryable_execute(
+            tuple_cur,
+            """
+            WITH candidate AS (
+                SELECT steamAccountId
+                FROM players
+                WHERE hero_done=TRUE
+                  AND discover_done=TRUE
+                  AND assigned_to IS NULL
+                ORDER BY hero_refreshed_at ASC NULLS FIRST,
+                         steamAccountId ASC
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ),
+            updated AS (
                 UPDATE players
                 SET hero_done=FALSE,
                     assigned_to='refresh',
@@ -397,86 +592,158 @@ def _assign_next_task_on_connection(connection, *, run_cleanup: bool) -> dict |
                   AND discover_done=TRUE
                   AND assigned_to IS NULL
                 RETURNING steamAccountId, depth, highest_match_id
-                """,
-                (MAX_HERO_TASK_SIZE,),
-                retry_interval=ASSIGNMENT_RETRY_INTERVAL,
-            ).fetchall()
+            )
+            SELECT steamAccountId, depth, highest_match_id
+            FROM updated
+            ORDER BY depth ASC, steamAccountId ASC
+            """,
+            (MAX_HERO_TASK_SIZE,),
+            retry_interval=ASSIGNMENT_RETRY_INTERVAL,
+            prepare=True,
+        ).fetchall()
 
-            if not assigned_rows:
-                return None
+    if not assigned_rows:
+        return None
 
-            players: list[dict] = []
-            for assigned_row in assigned_rows:
-                try:
-                    steam_account_id = int(row_value(assigned_row, "steamAccountId"))
-                except (TypeError, ValueError):
-                    continue
-                if steam_account_id <= 0:
-                    continue
-                try:
-                    depth = int(row_value(assigned_row, "depth"))
-                except (TypeError, ValueError):
-                    depth = None
-                highest_match_id_value = row_value(assigned_row, "highest_match_id")
-                try:
-                    highest_match_id = (
-                        int(highest_match_id_value)
-                        if highest_match_id_value is not None
-                        else None
-                    )
-                except (TypeError, ValueError):
-                    highest_match_id = None
-                if highest_match_id is not None and highest_match_id < 0:
-                    highest_match_id = None
-                players.append(
-                    {
-                        "steamAccountId": steam_account_id,
-                        "depth": depth,
-                        "highestMatchId": highest_match_id,
-                    }
-                )
+    players = [
+        {
+            "steamAccountId": steam_account_id,
+            "depth": depth,
+            "highestMatchId": (
+                highest_match_id
+                if highest_match_id is not None and highest_match_id >= 0
+                else None
+            ),
+        }
+        for steam_account_id, depth, highest_match_id in assigned_rows
+        if steam_account_id > 0
+    ]
 
-            if not players:
+    if not players:
+        return None
+
+    steam_account_ids = [p["steamAccountId"] for p in players]
+    payload = {
+        "type": "refresh_player_data",
+        "steamAccountId": steam_account_ids[0],
+        "steamAccountIds": steam_account_ids,
+        "players": players,
+    }
+    first = players[0]
+    if first.get("depth") is not None:
+        payload["depth"] = first["depth"]
+    if first.get("highestMatchId") is not None:
+        payload["highestMatchId"] = first["highestMatchId"]
+    return payload
+
+
+def _apply_assignment_state(state: _AssignmentState) -> None:
+    """Move the hero cursor and count the assignments of a committed claim."""
+
+    global _hero_cursor
+    if state.hero_cursor is not None:
+        with _hero_cursor_lock:
+            # Compare-and-set: a reset since the claim read the cursor wins.
+            if _hero_cursor_generation == state.hero_cursor_generation:
+                _hero_cursor = state.hero_cursor
+    if state.assigned:
+        _increment_assignment_counter(state.assigned)
+
+
+def _assign_next_task_on_connection(
+    connection,
+    *,
+    run_cleanup: bool,
+    state: _AssignmentState,
+) -> dict | None:
+    with connection.cursor() as cur:
+        if run_cleanup:
+            maybe_run_assignment_cleanup(connection, cur)
+
+        candidate_payload = _assign_next_hero(cur, state)
+
+        if candidate_payload is None:
+            candidate_payload = _assign_discovery(cur)
+            if candidate_payload is _DISCOVERY_THROTTLED:
                 return None
 
-            players.sort(
-                key=lambda entry: (entry.get("depth") or 0, entry["steamAccountId"])
-            )
-            steam_account_ids = [p["steamAccountId"] for p in players]
-            candidate_payload = {
-                "type": "refresh_player_data",
-                "steamAccountId": steam_account_ids[0],
-                "steamAccountIds": steam_account_ids,
-                "players": players,
-            }
-            first = players[0]
-            if first.get("depth") is not None:
-                candidate_payload["depth"] = first["depth"]
-            if first.get("highestMatchId") is not None:
-                candidate_payload["highestMatchId"] = first["highestMatchId"]
+        if candidate_payload is None:
+            candidate_payload = _assign_refresh(cur)
 
         if candidate_payload and candidate_payload is not _DISCOVERY_THROTTLED:
-            _increment_assignment_counter(cur)
+            state.assigned += 1
             return candidate_payload
 
     return None
 
 
-def _increment_assignment_counter(cur) -> int:
-    row = retryable_execute(
+def _flush_assignment_state(cur, pending: int) -> None:
+    """Persist buffered counter ticks and the hero cursor in one statement.
+
+    The counter row carries a delta that is added to the stored value while
+    the cursor row simply overwrites it.
+    """
+
+    with _hero_cursor_lock:
+        hero_cursor = _hero_cursor
+    parameters: list[object] = [TASK_ASSIGNMENT_COUNTER_KEY, str(pending)]
+    if hero_cursor is not None:
+        parameters.extend([HERO_ASSIGNMENT_CURSOR_KEY, str(hero_cursor)])
+    values_sql = ", ".join(["(%s, %s)"] * (len(parameters) // 2))
+    retryable_execute(
         cur,
-        """
+        f"""
         INSERT INTO meta (key, value)
-        VALUES (%s, '1')
-        ON CONFLICT(key) DO UPDATE SET value=CAST(meta.value AS INTEGER) + 1
-        RETURNING CAST(value AS INTEGER) AS value
+        VALUES {values_sql}
+        ON CONFLICT(key) DO UPDATE
+        SET value=CASE
+            WHEN meta.key=%s
+            THEN CAST(
+                CAST(meta.value AS INTEGER) + CAST(excluded.value AS INTEGER)
+                AS TEXT
+            )
+            ELSE excluded.value
+        END
         """,
-        ("task_assignment_counter",),
+        (*parameters, TASK_ASSIGNMENT_COUNTER_KEY),
         retry_interval=ASSIGNMENT_RETRY_INTERVAL,
-    ).fetchone()
-    if not row:
-        return 0
+    )
+
+
+def _increment_assignment_counter(count: int) -> None:
+    """Buffer ``count`` committed assignments, persisting them every few ticks.
+
+    The counter is advisory, so increments are buffered in-process and written
+    to ``meta`` as a single delta. A crash loses at most the buffered ticks.
+    """
+
+    global _counter_pending
+    with _counter_lock:
+        _counter_pending += count
+        due = _counter_pending >= COUNTER_FLUSH_INTERVAL
+    if due:
+        flush_assignment_state()
+
+
+def flush_assignment_state() -> None:
+    """Persist buffered assignment counter increments and the hero cursor."""
+
+    global _counter_pending
+    # The buffer is taken under the lock but written without it, so callers
+    # counting new ticks never wait on the database.
+    with _counter_lock:
+        pending = _counter_pending
+        if not pending:
+            return
+        _counter_pending = 0
     try:
-        return int(row["value"])
-    except (TypeError, ValueError):
-        return 0
+        with db_connection(write=True) as conn:
+            with conn.cursor() as cur:
+                _flush_assignment_state(cur, pending)
+    except Exception:  # pragma: no cover - best effort logging
+        _LOGGER.exception("Failed to flush the assignment state")
+        with _counter_lock:
+            _counter_pending += pending
+
+
+atexit.register(flush_assignment_state)
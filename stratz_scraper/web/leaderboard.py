@@ -2,15 +2,24 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
-from ..database import db_connection, row_value
-from ..heroes import HEROES, HERO_SLUGS, hero_slug
+from psycopg.rows import tuple_row
+
+from ..database import db_connection
+from ..heroes import HERO_ID_TO_NAME_SLUG, HERO_SLUGS
+from .response_cache import cached_value
 
 __all__ = ["fetch_best_payload", "fetch_hero_leaderboard", "fetch_overall_leaderboard"]
 
+HERO_LEADERBOARD_CACHE_TTL = 30.0
 
-def fetch_hero_leaderboard(slug: str) -> Optional[Tuple[str, str, List[dict]]]:
+_UNKNOWN_HERO: Tuple[None, None] = (None, None)
+
+
+@lru_cache(maxsize=512)
+def _resolve_hero(slug: str) -> Optional[Tuple[int, str, str]]:
     normalized = slug.strip().replace(" ", "_").lower()
     hero_entry = HERO_SLUGS.get(normalized)
     if not hero_entry:
@@ -18,49 +27,66 @@ def fetch_hero_leaderboard(slug: str) -> Optional[Tuple[str, str, List[dict]]]:
     hero_id, hero_name = hero_entry
     if hero_id == 0:
         return None
+    return hero_id, hero_name, normalized
+
+
+def _query_hero_leaderboard(hero_id: int) -> List[dict]:
     with db_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT steamAccountId, matches, wins
-            FROM hero_top100
-            WHERE heroId=%s AND heroId<>0
-            ORDER BY matches DESC, wins DESC, steamAccountId ASC
-            LIMIT 100
-            """,
-            (hero_id,),
-        ).fetchall()
-    players = [
-        {
-            "steamAccountId": row_value(row, "steamAccountId"),
-            "matches": row["matches"],
-            "wins": row["wins"],
-        }
-        for row in rows
+        with conn.cursor(row_factory=tuple_row) as cur:
+            rows = cur.execute(
+                """
+                SELECT steamAccountId, matches, wins
+                FROM hero_top100
+                WHERE heroId=%s AND heroId<>0
+                ORDER BY matches DESC, wins DESC, steamAccountId ASC
+                LIMIT 100
+                """,
+                (hero_id,),
+                prepare=True,
+            ).fetchall()
+    return [
+        {"steamAccountId": steam_account_id, "matches": matches, "wins": wins}
+        for steam_account_id, matches, wins in rows
     ]
+
+
+def fetch_hero_leaderboard(slug: str) -> Optional[Tuple[str, str, List[dict]]]:
+    resolved = _resolve_hero(slug)
+    if resolved is None:
+        return None
+    hero_id, hero_name, normalized = resolved
+    # Keyed by hero id so arbitrary slugs cannot grow the cache.
+    players = cached_value(
+        f"hero-leaderboard:{hero_id}",
+        HERO_LEADERBOARD_CACHE_TTL,
+        lambda: _query_hero_leaderboard(hero_id),
+    )
     return hero_name, normalized, players
 
 
 def fetch_overall_leaderboard() -> List[Dict[str, object]]:
     with db_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT heroId, steamAccountId, matches, wins
-            FROM hero_top100
-            WHERE heroId<>0
-            ORDER BY matches DESC, wins DESC, steamAccountId ASC
-            LIMIT 100
-            """
-        ).fetchall()
+        with conn.cursor(row_factory=tuple_row) as cur:
+            rows = cur.execute(
+                """
+                SELECT heroId, steamAccountId, matches, wins
+                FROM hero_top100
+                WHERE heroId<>0
+                ORDER BY matches DESC, wins DESC, steamAccountId ASC
+                LIMIT 100
+                """,
+                prepare=True,
+            ).fetchall()
+    lookup = HERO_ID_TO_NAME_SLUG.get
     players: List[Dict[str, object]] = []
-    for row in rows:
-        hero_id = row_value(row, "heroId")
-        hero_name = HEROES.get(hero_id)
-        hero_slug_value = hero_slug(hero_name) if isinstance(hero_name, str) else None
-        players.append(
+    append = players.append
+    for hero_id, steam_account_id, matches, wins in rows:
+        hero_name, hero_slug_value = lookup(hero_id, _UNKNOWN_HERO)
+        append(
             {
-                "steamAccountId": row_value(row, "steamAccountId"),
-                "matches": row["matches"] or 0,
-                "wins": row["wins"] or 0,
+                "steamAccountId": steam_account_id,
+                "matches": matches or 0,
+                "wins": wins or 0,
                 "heroName": hero_name,
                 "heroSlug": hero_slug_value,
             }
@@ -70,37 +96,35 @@ def fetch_overall_leaderboard() -> List[Dict[str, object]]:
 
 def fetch_best_payload() -> List[Dict]:
     with db_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT heroId, steamAccountId, matches, wins
-            FROM (
-                SELECT
-                    heroId,
-                    steamAccountId,
-                    matches,
-                    wins,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY heroId
-                        ORDER BY matches DESC, wins DESC, steamAccountId
-                    ) AS rn
-                FROM hero_top100
-            ) ranked
-            WHERE rn = 1 AND heroId<>0
-            ORDER BY matches DESC, wins DESC, steamAccountId ASC
-            """
-        ).fetchall()
+        with conn.cursor(row_factory=tuple_row) as cur:
+            rows = cur.execute(
+                """
+                SELECT heroId, steamAccountId, matches, wins
+                FROM (
+                    SELECT DISTINCT ON (heroId)
+                        heroId,
+                        steamAccountId,
+                        matches,
+                        wins
+                    FROM hero_top100
+                    WHERE heroId<>0
+                    ORDER BY heroId, matches DESC, wins DESC, steamAccountId ASC
+                ) best
+                ORDER BY matches DESC, wins DESC, steamAccountId ASC
+                """,
+                prepare=True,
+            ).fetchall()
     payload: List[Dict] = []
-    for row in rows:
-        hero_id = row_value(row, "heroId")
-        hero_name = HEROES.get(hero_id)
+    for hero_id, steam_account_id, matches, wins in rows:
+        hero_name, hero_slug_value = HERO_ID_TO_NAME_SLUG.get(hero_id, _UNKNOWN_HERO)
         payload.append(
             {
                 "hero_id": hero_id,
                 "hero_name": hero_name,
-                "player_id": row_value(row, "steamAccountId"),
-                "matches": row["matches"],
-                "wins": row["wins"],
-                "hero_slug": hero_slug(hero_name) if isinstance(hero_name, str) else None,
+                "player_id": steam_account_id,
+                "matches": matches,
+                "wins": wins,
+                "hero_slug": hero_slug_value,
             }
         )
     return payload
@@ -2,12 +2,12 @@
 
 from __future__ import annotations
 
-import logging
-import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Mapping
 
 from ..database import db_connection, retryable_execute
+from .scheduler import schedule_periodic
 
 __all__ = [
     "ensure_progress_snapshotter",
@@ -17,11 +17,6 @@ __all__ = [
 ]
 
 
-_LOGGER = logging.getLogger(__name__)
-
-_SNAPSHOT_THREAD: threading.Thread | None = None
-_SNAPSHOT_STOP_EVENT: threading.Event | None = None
-_SNAPSHOT_LOCK = threading.Lock()
 _SNAPSHOT_INTERVAL = timedelta(minutes=5)
 
 
@@ -30,10 +25,10 @@ def fetch_progress() -> dict:
         row = conn.execute(
             """
             SELECT
-                COUNT(*) AS total,
-                COUNT(*) FILTER (WHERE hero_done=TRUE) AS hero_done,
-                COUNT(*) FILTER (WHERE discover_done=TRUE) AS discover_done
-            FROM players
+                SUM(players_total)::BIGINT AS total,
+                SUM(hero_done)::BIGINT AS hero_done,
+                SUM(discover_done)::BIGINT AS discover_done
+            FROM player_counters
             """
         ).fetchone()
         if row is None:
@@ -78,41 +73,49 @@ def record_progress_snapshot(
     """
 
     captured_at = _normalize_captured_at(captured_at)
+    required_keys = ("players_total", "hero_done", "discover_done")
+
     if progress is None:
-        progress = fetch_progress()
+        # Read the live totals and store them in one statement on the write
+        # connection instead of checking out a second one for the read.
+        source_sql = """
+            SELECT
+                %s,
+                COALESCE(SUM(players_total), 0),
+                COALESCE(SUM(hero_done), 0),
+                COALESCE(SUM(discover_done), 0)
+            FROM player_counters
+        """
+        parameters: tuple[object, ...] = (captured_at,)
     else:
         progress = dict(progress)
-    required_keys = ("players_total", "hero_done", "discover_done")
-    normalized: dict[str, int] = {}
-    for key in required_keys:
-        value = int(progress.get(key, 0))
-        normalized[key] = value
+        source_sql = "VALUES (%s, %s, %s, %s)"
+        parameters = (
+            captured_at,
+            *(int(progress.get(key, 0)) for key in required_keys),
+        )
 
     with db_connection(write=True) as conn:
-        cur = conn.cursor()
-        retryable_execute(
-            cur,
-            """
+        row = retryable_execute(
+            conn.cursor(),
+            f"""
             INSERT INTO progress_snapshots (
                 captured_at,
                 players_total,
                 hero_done,
                 discover_done
             )
-            VALUES (%s, %s, %s, %s)
+            {source_sql}
             ON CONFLICT (captured_at) DO UPDATE
             SET
                 players_total=EXCLUDED.players_total,
                 hero_done=EXCLUDED.hero_done,
                 discover_done=EXCLUDED.discover_done
+            RETURNING players_total, hero_done, discover_done
             """,
-            (
-                captured_at,
-                normalized["players_total"],
-                normalized["hero_done"],
-                normalized["discover_done"],
-            ),
-        )
+            parameters,
+        ).fetchone()
+    normalized = {key: int(row[key]) for key in required_keys}
 
     snapshot = {
         "captured_at": captured_at,
@@ -121,54 +124,37 @@ def record_progress_snapshot(
     return snapshot
 
 
-def _seconds_until_next_interval(reference: datetime) -> float:
-    normalized = _normalize_captured_at(reference)
-    next_tick = normalized + _SNAPSHOT_INTERVAL
-    wait_seconds = (next_tick - reference).total_seconds()
-    if wait_seconds <= 0:
-        return 1.0
-    return wait_seconds
-
-
-def _progress_snapshot_worker(stop_event: threading.Event) -> None:
-    while not stop_event.is_set():
-        try:
-            record_progress_snapshot()
-        except Exception:  # pragma: no cover - best effort logging
-            _LOGGER.exception("Progress snapshot worker failed")
-        now = datetime.now(timezone.utc)
-        if stop_event.wait(_seconds_until_next_interval(now)):
-            break
+def _seconds_until_next_interval() -> float:
+    # Snapshot boundaries are multiples of the interval in Unix time, so the
+    # wait falls out of a modulo without building any datetimes.
+    interval_seconds = _SNAPSHOT_INTERVAL.total_seconds()
+    return interval_seconds - (time.time() % interval_seconds)
 
 
 def ensure_progress_snapshotter() -> None:
-    """Start the background worker that records five-minute progress snapshots."""
-
-    global _SNAPSHOT_THREAD, _SNAPSHOT_STOP_EVENT
-    with _SNAPSHOT_LOCK:
-        if _SNAPSHOT_THREAD and _SNAPSHOT_THREAD.is_alive():
-            return
-        if _SNAPSHOT_STOP_EVENT is not None:
-            _SNAPSHOT_STOP_EVENT.set()
-        stop_event = threading.Event()
-        thread = threading.Thread(
-            target=_progress_snapshot_worker,
-            args=(stop_event,),
-            name="progress-snapshotter",
-            daemon=True,
-        )
-        thread.start()
-        _SNAPSHOT_THREAD = thread
-        _SNAPSHOT_STOP_EVENT = stop_event
+    """Register the periodic job that records five-minute progress snapshots."""
+
+    schedule_periodic(
+        "progress-snapshot",
+        record_progress_snapshot,
+        _seconds_until_next_interval,
+    )
 
 
 def list_progress_snapshots(
-    *, start: datetime | None = None, end: datetime | None = None
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int | None = None,
 ) -> list[dict]:
-    """Return stored progress snapshots filtered by the provided time range."""
+    """Return stored progress snapshots filtered by the provided time range.
+
+    With ``limit`` only the newest ``limit`` snapshots in the range are
+    returned, still in ascending order.
+    """
 
     clauses: list[str] = []
-    params: list[datetime] = []
+    params: list[object] = []
     if start is not None:
         clauses.append("captured_at >= %s")
         params.append(start)
@@ -186,11 +172,18 @@ def list_progress_snapshots(
         FROM progress_snapshots
         """
         + where_sql
-        + " ORDER BY captured_at ASC"
     )
+    if limit is None:
+        sql += " ORDER BY captured_at ASC"
+    else:
+        # Walk the primary key backwards so only ``limit`` rows are read.
+        sql += " ORDER BY captured_at DESC LIMIT %s"
+        params.append(max(int(limit), 0))
 
     with db_connection() as conn:
         rows = conn.execute(sql, tuple(params)).fetchall()
+    if limit is not None:
+        rows.reverse()
 
     return [
         {
@@ -2,30 +2,59 @@
 
 from __future__ import annotations
 
-from flask import Request, request
+import ipaddress
+from functools import lru_cache
+
+from flask import Request, g, has_request_context, request
 
 __all__ = ["is_local_request"]
 
+LOCAL_HOSTS = frozenset(("127.0.0.1", "::1"))
+
 
+@lru_cache(maxsize=1024)
 def _is_loopback_address(address: str) -> bool:
-    address = (address or "").strip()
+    address = address.strip()
     if not address:
         return False
-    return address in {"127.0.0.1", "::1"} or address.startswith("127.")
-
+    try:
+        parsed = ipaddress.ip_address(address)
+    except ValueError:
+        # Not a bare IP (e.g. carries a port); keep the plain string check.
+        return address in LOCAL_HOSTS or address.startswith("127.")
+    # ``::ffff:127.0.0.1`` is only reported as loopback via its IPv4 form.
+    mapped = getattr(parsed, "ipv4_mapped", None)
+    return (mapped or parsed).is_loopback
 
-def is_local_request(active_request: Request | None = None) -> bool:
-    """Return ``True`` when the incoming request originated from localhost."""
 
-    active_request = active_request or request
+def _evaluate_local_request(active_request: Request) -> bool:
     remote_addr = getattr(active_request, "remote_addr", None)
-    if _is_loopback_address(remote_addr or ""):
+    if remote_addr and _is_loopback_address(remote_addr):
         return True
 
-    access_route = getattr(active_request, "access_route", []) or []
-    for addr in access_route:
-        if _is_loopback_address(addr or ""):
-            return True
+    access_route = getattr(active_request, "access_route", None)
+    if access_route:
+        return any(_is_loopback_address(addr) for addr in access_route)
+
+    forwarded_for = active_request.headers.get("X-Forwarded-For", "")
+    if not forwarded_for:
+        return False
+    return any(_is_loopback_address(addr) for addr in forwarded_for.split(","))
 
-    forwarded_for = (active_request.headers.get("X-Forwarded-For", "") if active_request else "").split(",")
-    return any(_is_loopback_address(addr) for addr in forwarded_for)
+
+def is_local_request(active_request: Request | None = None) -> bool:
+    """Return ``True`` when the incoming request originated from localhost.
+
+    The result for the active Flask request is cached on :data:`flask.g` so
+    repeated checks within one request do not re-parse the headers.
+    """
+
+    if active_request is not None:
+        return _evaluate_local_request(active_request)
+    if not has_request_context():
+        return False
+    cached = g.get("_is_local_request")
+    if cached is None:
+        cached = _evaluate_local_request(request)
+        g._is_local_request = cached
+    return cached
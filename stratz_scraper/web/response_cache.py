@@ -0,0 +1,87 @@
+"""In-process caching for slowly changing responses."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, TypeVar
+
+from flask import Response, current_app
+
+__all__ = ["cached_json_response", "cached_value", "invalidate_cached_responses"]
+
+T = TypeVar("T")
+
+_ENTRIES: dict[str, tuple[int, int, object]] = {}
+_KEY_LOCKS: dict[str, threading.Lock] = {}
+_REGISTRY_LOCK = threading.Lock()
+_VERSION = 0
+
+
+def _key_lock(key: str) -> threading.Lock:
+    lock = _KEY_LOCKS.get(key)
+    if lock is None:
+        with _REGISTRY_LOCK:
+            lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    return lock
+
+
+def _build_response(body: bytes) -> Response:
+    return current_app.response_class(body, mimetype="application/json")
+
+
+def cached_value(
+    key: str,
+    ttl: float,
+    producer: Callable[[], T],
+    *,
+    versioned: bool = True,
+) -> T:
+    """Return ``producer()``, reusing the result for ``ttl`` seconds.
+
+    Concurrent callers within the same window share a single ``producer`` call.
+    Versioned entries are also dropped whenever
+    :func:`invalidate_cached_responses` runs; pass ``versioned=False`` for
+    values that should only expire with their TTL.
+    Cached values are shared between requests and must not be mutated.
+    """
+
+    bucket = int(time.monotonic() // ttl)
+    version = _VERSION if versioned else 0
+    entry = _ENTRIES.get(key)
+    if entry is not None and entry[0] == bucket and entry[1] == version:
+        return entry[2]
+    with _key_lock(key):
+        version = _VERSION if versioned else 0
+        entry = _ENTRIES.get(key)
+        if entry is not None and entry[0] == bucket and entry[1] == version:
+            return entry[2]
+        value = producer()
+        _ENTRIES[key] = (bucket, version, value)
+    return value
+
+
+def cached_json_response(
+    key: str,
+    ttl: float,
+    producer: Callable[[], object],
+    *,
+    versioned: bool = True,
+) -> Response:
+    """Return ``producer()`` as JSON, reusing the serialized body for ``ttl`` seconds."""
+
+    body = cached_value(
+        key,
+        ttl,
+        lambda: current_app.json.response(producer()).get_data(),
+        versioned=versioned,
+    )
+    return _build_response(body)
+
+
+def invalidate_cached_responses() -> None:
+    """Drop every versioned cached value so the next request reads fresh data."""
+
+    global _VERSION
+    with _REGISTRY_LOCK:
+        _VERSION += 1
@@ -0,0 +1,100 @@
+"""Shared scheduler for periodic background jobs."""
+
+from __future__ import annotations
+
+import logging
+import sched
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+__all__ = ["schedule_periodic"]
+
+_LOGGER = logging.getLogger(__name__)
+
+# Used when ``next_delay`` fails before it ever returned a delay.
+_FALLBACK_DELAY = 60.0
+
+_wake_event = threading.Event()
+
+
+def _delay(seconds: float) -> None:
+    # Waking on ``_wake_event`` lets newly scheduled jobs preempt a long sleep.
+    if _wake_event.wait(seconds):
+        _wake_event.clear()
+
+
+_scheduler = sched.scheduler(time.monotonic, _delay)
+_job_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="periodic-job")
+_scheduler_thread: threading.Thread | None = None
+_registered_jobs: set[str] = set()
+_registry_lock = threading.Lock()
+
+
+def _scheduler_loop() -> None:
+    while True:
+        _scheduler.run()
+        _wake_event.wait()
+        _wake_event.clear()
+
+
+def _enter(delay: float, action: Callable[[], None]) -> None:
+    _scheduler.enter(max(delay, 0.0), 0, action)
+    _wake_event.set()
+
+
+def _ensure_scheduler_thread() -> None:
+    global _scheduler_thread
+    if _scheduler_thread and _scheduler_thread.is_alive():
+        return
+    thread = threading.Thread(
+        target=_scheduler_loop,
+        name="periodic-scheduler",
+        daemon=True,
+    )
+    thread.start()
+    _scheduler_thread = thread
+
+
+def schedule_periodic(
+    name: str,
+    job: Callable[[], None],
+    next_delay: Callable[[], float],
+    *,
+    initial_delay: float = 0.0,
+) -> None:
+    """Run ``job`` repeatedly on the shared scheduler.
+
+    The scheduler thread only keeps time; ``job`` runs on a small worker pool so
+    slow database work never delays other jobs. The next run is scheduled
+    ``next_delay()`` seconds after the previous one finishes, so runs of the
+    same job never overlap. Registering an already known ``name`` is a no-op.
+    If ``next_delay()`` raises, the previous delay is reused so the job keeps
+    running.
+    """
+
+    last_delay = _FALLBACK_DELAY
+
+    def _run() -> None:
+        nonlocal last_delay
+        try:
+            job()
+        except Exception:  # pragma: no cover - best effort logging
+            _LOGGER.exception("Periodic job %s failed", name)
+        finally:
+            try:
+                last_delay = next_delay()
+            except Exception:  # pragma: no cover - best effort logging
+                _LOGGER.exception("Periodic job %s failed to compute its delay", name)
+            _enter(last_delay, _submit)
+
+    def _submit() -> None:
+        _job_executor.submit(_run)
+
+    with _registry_lock:
+        _ensure_scheduler_thread()
+        if name in _registered_jobs:
+            return
+        _registered_jobs.add(name)
+        _enter(initial_delay, _submit)
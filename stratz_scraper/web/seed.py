@@ -6,11 +6,16 @@ from ..database import db_connection, retryable_execute
 
 __all__ = ["seed_players"]
 
+SEED_BATCH_SIZE = 10_000
+
 
 def seed_players(start: int, end: int) -> None:
     with db_connection(write=True) as conn:
         cur = conn.cursor()
-        for pid in range(start, end + 1):
+        for batch_start in range(start, end + 1, SEED_BATCH_SIZE):
+            batch_end = min(batch_start + SEED_BATCH_SIZE - 1, end)
+            # The ids form a contiguous range, so the server generates the rows
+            # itself and only the bounds cross the wire.
             retryable_execute(
                 cur,
                 """
@@ -20,8 +25,12 @@ def seed_players(start: int, end: int) -> None:
                     hero_done,
                     discover_done
                 )
-                VALUES (%s,%s,FALSE,FALSE)
+                SELECT gs, 0, FALSE, FALSE
+                FROM generate_series(%s::bigint, %s::bigint) AS gs
                 ON CONFLICT (steamAccountId) DO NOTHING
                 """,
-                (pid, 0),
+                (batch_start, batch_end),
             )
+            # Seeding is idempotent, so committing per batch keeps a retry from
+            # rolling back the batches that already landed.
+            conn.commit()
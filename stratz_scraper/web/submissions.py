@@ -2,21 +2,30 @@
 
 from __future__ import annotations
 
-from collections import OrderedDict
+import logging
 from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable, Iterator, List
 
 from ..database import (
+    HERO_TOP100_CHANGED_SETTING,
     close_cached_connections,
     db_connection,
     retryable_execute,
     retryable_executemany,
     row_value,
 )
+from .assignment import reset_hero_assignment_cursor
+from .response_cache import invalidate_cached_responses
 
-BACKGROUND_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+_LOGGER = logging.getLogger(__name__)
+
+BACKGROUND_WORKERS = 4
+BACKGROUND_EXECUTOR = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS,
+    thread_name_prefix="submission",
+)
 _DISCOVERY_SUBMISSION_LOCK_ID = int.from_bytes(b"discover", "big")
-_DISCOVERY_BATCH_SIZE = 50
+_DISCOVERY_BATCH_SIZE = 2000
 
 __all__ = [
     "BACKGROUND_EXECUTOR",
@@ -52,11 +61,10 @@ def _unmark_hero_task(steam_account_id: int) -> None:
                 WHERE steamAccountId=%s
                 """,
                 (steam_account_id,),
+                prepare=True,
             )
     except Exception:
-        import traceback
-
-        traceback.print_exc()
+        _LOGGER.exception("Failed to unmark hero task for %s", steam_account_id)
 
 
 def _unmark_discover_task(steam_account_id: int) -> None:
@@ -74,21 +82,21 @@ def _unmark_discover_task(steam_account_id: int) -> None:
                 WHERE steamAccountId=%s
                 """,
                 (steam_account_id,),
+                prepare=True,
             )
     except Exception:
-        import traceback
+        _LOGGER.exception("Failed to unmark discover task for %s", steam_account_id)
 
-        traceback.print_exc()
 
-
-def _extract_hero_rows(
-    steam_account_id: int, heroes_payload: Iterable[dict] | None
-) -> tuple[List[tuple[int, int, int, int]], List[int]]:
-    hero_stats_rows: List[tuple[int, int, int, int]] = []
+def _extract_hero_columns(
+    heroes_payload: Iterable[dict] | None,
+) -> tuple[List[int], List[int], List[int]]:
+    # Built column-wise because the upsert binds one array per column.
     hero_ids: List[int] = []
-    seen: set[int] = set()
+    matches_column: List[int] = []
+    wins_column: List[int] = []
     if heroes_payload is None:
-        return hero_stats_rows, hero_ids
+        return hero_ids, matches_column, wins_column
     for hero in heroes_payload:
         try:
             hero_id = int(hero["heroId"])
@@ -99,11 +107,10 @@ def _extract_hero_rows(
             wins = int(hero.get("wins", 0))
         except (KeyError, TypeError, ValueError):
             continue
-        hero_stats_rows.append((steam_account_id, hero_id, matches, wins))
-        if hero_id not in seen:
-            hero_ids.append(hero_id)
-            seen.add(hero_id)
-    return hero_stats_rows, hero_ids
+        hero_ids.append(hero_id)
+        matches_column.append(matches)
+        wins_column.append(wins)
+    return hero_ids, matches_column, wins_column
 
 
 def _iter_consuming_values(values: Iterable[object]) -> Iterator[object]:
@@ -137,37 +144,21 @@ def _iter_discovered_candidate_ids(
         yield normalized_id
 
 
-def _iter_discovered_child_rows(
+def _iter_discovered_child_batches(
     discovered_payload: Iterable[object] | None,
     *,
-    parent_id: int,
-    next_depth: int,
     batch_size: int,
-) -> Iterator[List[tuple[int, int]]]:
+) -> Iterator[List[int]]:
+    # Duplicates and the parent id are left in; the insert filters both out.
     effective_batch_size = max(1, batch_size)
-    pending: OrderedDict[int, None] = OrderedDict()
-
-    def _drain_pending(limit: int | None) -> List[tuple[int, int]]:
-        batch: List[tuple[int, int]] = []
-        while pending and (limit is None or len(batch) < limit):
-            candidate, _ = pending.popitem(last=False)
-            batch.append((candidate, next_depth))
-        return batch
-
+    batch: List[int] = []
     for candidate_id in _iter_discovered_candidate_ids(discovered_payload):
-        if candidate_id == parent_id:
-            continue
-        if candidate_id in pending:
-            continue
-        pending[candidate_id] = None
-        if len(pending) >= effective_batch_size:
-            batch = _drain_pending(effective_batch_size)
-            if batch:
-                yield batch
-    if pending:
-        batch = _drain_pending(None)
-        if batch:
+        batch.append(candidate_id)
+        if len(batch) >= effective_batch_size:
             yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 def _resolve_next_depth(
@@ -201,174 +192,51 @@ def process_hero_submission(
     steam_account_id: int,
     heroes_payload: Iterable[dict] | None,
 ) -> None:
-    hero_stats_rows, hero_ids = _extract_hero_rows(steam_account_id, heroes_payload)
+    hero_ids, matches, wins = _extract_hero_columns(heroes_payload)
     try:
+        if not hero_ids:
+            return
         with db_connection(write=True) as conn:
             cur = conn.cursor()
-            if hero_stats_rows:
-                retryable_executemany(
-                    cur,
-                    """
-                    INSERT INTO hero_stats (steamAccountId, heroId, matches, wins)
-                    VALUES (%s,%s,%s,%s)
-                    ON CONFLICT(steamAccountId, heroId) DO UPDATE SET
-                        matches = CASE
-                            WHEN excluded.matches > hero_stats.matches
-                            THEN excluded.matches
-                            ELSE hero_stats.matches
-                        END,
-                        wins = CASE
-                            WHEN excluded.matches > hero_stats.matches
-                            THEN excluded.wins
-                            ELSE hero_stats.wins
-                        END
-                    """,
-                    hero_stats_rows,
-                )
-            if hero_ids:
-                stats_rows = retryable_execute(
-                    cur,
-                    """
-                    SELECT heroId, matches, wins
-                    FROM hero_stats
-                    WHERE steamAccountId=%s AND heroId = ANY(%s)
-                    """,
-                    (steam_account_id, list(hero_ids)),
-                ).fetchall()
-                stats_by_hero = {
-                    int(row_value(row, "heroId")): (
-                        int(row_value(row, "matches") or 0),
-                        int(row_value(row, "wins") or 0),
-                    )
-                    for row in stats_rows
-                }
-                if not stats_by_hero:
-                    return
-                hero_keys = list(stats_by_hero.keys())
-                existing_rows = retryable_execute(
-                    cur,
-                    """
-                    SELECT heroId, matches, wins
-                    FROM hero_top100
-                    WHERE steamAccountId=%s AND heroId = ANY(%s)
-                    """,
-                    (steam_account_id, hero_keys),
-                ).fetchall()
-                existing_by_hero = {
-                    int(row_value(row, "heroId")): (
-                        int(row_value(row, "matches") or 0),
-                        int(row_value(row, "wins") or 0),
-                    )
-                    for row in existing_rows
-                }
-                count_rows = retryable_execute(
-                    cur,
-                    """
-                    SELECT heroId, COUNT(*) AS total
-                    FROM hero_top100
-                    WHERE heroId = ANY(%s)
-                    GROUP BY heroId
-                    """,
-                    (hero_keys,),
-                ).fetchall()
-                counts_by_hero = {
-                    int(row_value(row, "heroId")): int(row_value(row, "total") or 0)
-                    for row in count_rows
-                }
-                threshold_rows = retryable_execute(
-                    cur,
-                    """
-                    SELECT heroId, steamAccountId, matches, wins
-                    FROM (
-                        SELECT
-                            heroId,
-                            steamAccountId,
-                            matches,
-                            wins,
-                            ROW_NUMBER() OVER (
-                                PARTITION BY heroId
-                                ORDER BY matches DESC, wins DESC, steamAccountId ASC
-                            ) AS rn
-                        FROM hero_top100
-                        WHERE heroId = ANY(%s)
-                    ) ranked
-                    WHERE rn = 100
-                    """,
-                    (hero_keys,),
-                ).fetchall()
-                thresholds_by_hero = {
-                    int(row_value(row, "heroId")): (
-                        int(row_value(row, "steamAccountId")),
-                        int(row_value(row, "matches") or 0),
-                        int(row_value(row, "wins") or 0),
-                    )
-                    for row in threshold_rows
-                }
-                for hero_id, stats in stats_by_hero.items():
-                    matches, wins = stats
-                    existing_stats = existing_by_hero.get(hero_id)
-                    if existing_stats is not None:
-                        existing_matches, existing_wins = existing_stats
-                        if existing_matches != matches or existing_wins != wins:
-                            retryable_execute(
-                                cur,
-                                """
-                                UPDATE hero_top100
-                                SET matches=%s, wins=%s
-                                WHERE heroId=%s AND steamAccountId=%s
-                                """,
-                                (matches, wins, hero_id, steam_account_id),
-                            )
-                        continue
-                    hero_count = counts_by_hero.get(hero_id, 0)
-                    if hero_count < 100:
-                        retryable_execute(
-                            cur,
-                            """
-                            INSERT INTO hero_top100 (heroId, steamAccountId, matches, wins)
-                            VALUES (%s,%s,%s,%s)
-                            """,
-                            (hero_id, steam_account_id, matches, wins),
-                        )
-                        continue
-                    threshold_row = thresholds_by_hero.get(hero_id)
-                    if threshold_row is None:
-                        continue
-                    threshold_account, threshold_matches, threshold_wins = threshold_row
-                    if matches < threshold_matches:
-                        continue
-                    if matches == threshold_matches and wins <= threshold_wins:
-                        continue
-                    retryable_execute(
-                        cur,
-                        """
-                        INSERT INTO hero_top100 (heroId, steamAccountId, matches, wins)
-                        VALUES (%s,%s,%s,%s)
-                        """,
-                        (hero_id, steam_account_id, matches, wins),
-                    )
-                    retryable_execute(
-                        cur,
-                        """
-                        DELETE FROM hero_top100
-                        WHERE ctid = (
-                            SELECT ctid
-                            FROM hero_top100
-                            WHERE heroId=%s
-                            ORDER BY matches ASC, wins ASC, steamAccountId DESC
-                            LIMIT 1
-                        )
-                        """,
-                        (hero_id,),
-                    )
+            # One set-based upsert for the whole payload. ``DISTINCT ON`` keeps a
+            # repeated hero from hitting the same row twice in one statement, and
+            # the ``trg_hero_top100_*`` triggers fold the changed rows into
+            # ``hero_top100`` inside the same statement.
+            # It still goes through ``retryable_executemany`` (with a single
+            # parameter set) so a deadlock or lock timeout rolls back and
+            # replays the statement. ``hero_top100_maintain`` relies on rows
+            # only ever improving: existing rows are updated only when
+            # ``matches`` grows, and nothing deletes from ``hero_stats``.
+            retryable_executemany(
+                cur,
+                """
+                INSERT INTO hero_stats (steamAccountId, heroId, matches, wins)
+                SELECT DISTINCT ON (incoming.heroId)
+                    %s, incoming.heroId, incoming.matches, incoming.wins
+                FROM UNNEST(%s::integer[], %s::integer[], %s::integer[])
+                    AS incoming(heroId, matches, wins)
+                ORDER BY incoming.heroId, incoming.matches DESC, incoming.wins DESC
+                ON CONFLICT(steamAccountId, heroId) DO UPDATE SET
+                    matches = excluded.matches,
+                    wins = excluded.wins
+                WHERE excluded.matches > hero_stats.matches
+                """,
+                [(steam_account_id, hero_ids, matches, wins)],
+            )
+            top100_changed = False
+            if cur.rowcount > 0:
+                # Most submissions only touch players outside the top 100, so
+                # the leaderboard caches are kept unless the trigger reports
+                # that ``hero_top100`` actually changed.
+                row = cur.execute(
+                    "SELECT current_setting(%s, TRUE) AS changed",
+                    (HERO_TOP100_CHANGED_SETTING,),
+                ).fetchone()
+                top100_changed = row_value(row, "changed") == "on"
+        if top100_changed:
+            invalidate_cached_responses()
     except Exception:
-        import traceback
-
-        print(
-            f"[submit-background] failed to process hero stats for {steam_account_id}",
-            flush=True,
-        )
-        traceback.print_exc()
+        _LOGGER.exception("Failed to process hero stats for %s", steam_account_id)
         _unmark_hero_task(steam_account_id)
 
 
@@ -388,33 +256,69 @@ def process_discover_submission(
         parsed_assignment_depth,
     )
     try:
-        with db_connection(write=True) as conn:
-            for child_rows in _iter_discovered_child_rows(
+        # Materialize the batches up front: a retry rolls back the whole
+        # transaction, so every batch may need to be replayed.
+        child_batches = list(
+            _iter_discovered_child_batches(
                 discovered_payload,
-                parent_id=steam_account_id,
-                next_depth=next_depth_value,
                 batch_size=_DISCOVERY_BATCH_SIZE,
-            ):
+            )
+        )
+        with db_connection(write=True) as conn:
+            with conn.cursor() as cur:
+                # All batches share one transaction and one commit, taken under
+                # a single advisory lock instead of one per batch. If a
+                # ``lock_timeout`` is configured the wait can time out while
+                # other workers hold the lock; nothing has been written yet,
+                # so the retry just rolls back and waits again.
                 retryable_executemany(
-                    conn,
-                    """
-                    INSERT INTO players (
-                        steamAccountId,
-                        depth,
-                        hero_done,
-                        discover_done
-                    )
-                    VALUES (%s, %s, FALSE, FALSE)
-                    ON CONFLICT (steamAccountId) DO UPDATE
-                    SET
-                        depth = excluded.depth, highest_match_id = NULL, discover_done = FALSE
-                    WHERE excluded.depth < players.depth
-                    """,
-                    child_rows,
-                    reacquire_advisory_lock=_DISCOVERY_SUBMISSION_LOCK_ID,
+                    cur,
+                    "SELECT pg_advisory_xact_lock(%s)",
+                    [(_DISCOVERY_SUBMISSION_LOCK_ID,)],
                 )
-                conn.commit()
-            with conn.cursor() as cur:
+                batch_index = 0
+                while batch_index < len(child_batches):
+                    rolled_back = False
+
+                    def _mark_rolled_back() -> None:
+                        nonlocal rolled_back
+                        rolled_back = True
+
+                    # The whole batch goes out as one array parameter. Sorting
+                    # the ids gives concurrent submitters a consistent lock
+                    # order and ``DISTINCT`` keeps a repeated id from
+                    # conflicting with itself.
+                    retryable_executemany(
+                        cur,
+                        """
+                        INSERT INTO players (
+                            steamAccountId,
+                            depth,
+                            hero_done,
+                            discover_done
+                        )
+                        SELECT DISTINCT child.steamAccountId, %s::integer, FALSE, FALSE
+                        FROM UNNEST(%s::bigint[]) AS child(steamAccountId)
+                        WHERE child.steamAccountId <> %s
+                        ORDER BY child.steamAccountId
+                        ON CONFLICT (steamAccountId) DO UPDATE
+                        SET
+                            depth = excluded.depth, highest_match_id = NULL, discover_done = FALSE
+                        WHERE excluded.depth < players.depth
+                        """,
+                        [
+                            (
+                                next_depth_value,
+                                child_batches[batch_index],
+                                steam_account_id,
+                            )
+                        ],
+                        reacquire_advisory_lock=_DISCOVERY_SUBMISSION_LOCK_ID,
+                        on_rollback=_mark_rolled_back,
+                    )
+                    # The upsert is idempotent, so after a rollback it is safe
+                    # to replay from the first batch.
+                    batch_index = 0 if rolled_back else batch_index + 1
                 retryable_execute(
                     cur,
                     """
@@ -423,23 +327,11 @@ def process_discover_submission(
                     WHERE steamAccountId=%s
                     """,
                     (steam_account_id,),
+                    prepare=True,
                 )
-                retryable_execute(
-                    cur,
-                    """
-                    UPDATE meta
-                    SET value = '-1'
-                    WHERE key = 'hero_assignment_cursor';
-                    """
-                )
+        reset_hero_assignment_cursor()
     except Exception:
-        import traceback
-
-        print(
-            f"[submit-background] failed to process discovery for {steam_account_id}",
-            flush=True,
-        )
-        traceback.print_exc()
+        _LOGGER.exception("Failed to process discovery for %s", steam_account_id)
         _unmark_discover_task(steam_account_id)
 
 
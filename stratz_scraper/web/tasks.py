@@ -5,17 +5,12 @@ from __future__ import annotations
 from typing import Optional
 
 from ..database import db_connection, retryable_execute
-from .assignment import HERO_ASSIGNMENT_CURSOR_KEY
+from .assignment import reset_hero_assignment_cursor
 
 __all__ = ["reset_player_task"]
 
 
 def _reset_hero_task(cur, steam_account_id: int) -> int:
-    has_existing_stats = cur.execute(
-        "SELECT 1 FROM hero_stats WHERE steamAccountId=%s LIMIT 1",
-        (steam_account_id,),
-    ).fetchone()
-    hero_done_value = bool(has_existing_stats)
     update_cursor = retryable_execute(
         cur,
         """
@@ -32,15 +27,7 @@ def _reset_hero_task(cur, steam_account_id: int) -> int:
     )
     updated_rows = update_cursor.rowcount if update_cursor.rowcount is not None else 0
     if updated_rows:
-        retryable_execute(
-            cur,
-            """
-            INSERT INTO meta (key, value)
-            VALUES (%s, '-1')
-            ON CONFLICT(key) DO UPDATE SET value='-1'
-            """,
-            (HERO_ASSIGNMENT_CURSOR_KEY, ),
-        )
+        reset_hero_assignment_cursor()
     return updated_rows
 
 